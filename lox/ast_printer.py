@@ -1,33 +1,8 @@
-from lox.lox_types import Expr, Binary, Grouping, Literal, Unary
+from lox.lox_types import Expr, Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.statements import Print, Expression, Var, Block
 from lox.tokens import TokenType, Token
 from lox.typedispatch import visitor
 
-class AstPrinter:
-    def print(self, expr: Expr) -> str:
-        return expr.accept(self)
-
-    def visit_binary_expr(self, expr: Binary):
-        return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
-
-    def visit_grouping_expr(self, expr: Grouping):
-        return self.parenthesize("group", expr.expression)
-
-    def visit_literal_expr(self, expr: Literal):
-        if expr.value == None:
-            return ""
-        return str(expr.value)
-
-    def visit_unary_expr(self, expr: Unary):
-        return self.parenthesize(expr.operator.lexeme, expr.right)
-
-    def parenthesize(self, name: str, *exprs: Expr) -> str:
-        s = f"({name}"
-        for expr in exprs:
-            s += " "
-            s+= expr.accept(self)
-        s += ")"
-        return s
-
 class NewAstPrinter:
     def print(self, expr: Expr) -> str:
         return self.visit(expr)
@@ -50,6 +25,32 @@ class NewAstPrinter:
             return ""
         return str(expr.value)
 
+    @visitor(Variable)
+    def visit(self, expr: Variable):
+        return expr.name.lexeme
+
+    @visitor(Assignment)
+    def visit(self, expr: Assignment):
+        return self.parenthesize(f"= {expr.name.lexeme}", expr.value)
+
+    @visitor(Print)
+    def visit(self, stmt: Print):
+        return self.parenthesize("print", stmt.expr)
+
+    @visitor(Expression)
+    def visit(self, stmt: Expression):
+        return self.parenthesize(";", stmt.expr)
+
+    @visitor(Var)
+    def visit(self, stmt: Var):
+        if stmt.initializer is None:
+            return f"(var {stmt.name.lexeme})"
+        return self.parenthesize(f"var {stmt.name.lexeme}", stmt.initializer)
+
+    @visitor(Block)
+    def visit(self, stmt: Block):
+        return self.parenthesize("block", *stmt.stmts)
+
     def parenthesize(self, name: str, *exprs: Expr) -> str:
         s = f"({name}"
         for expr in exprs:
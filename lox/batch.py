@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Tuple
+
+from lox.engine import LoxEngine
+
+# Set in each worker process by init_worker
+_engine: LoxEngine = None
+
+def init_worker(engine: str, optimize: bool) -> None:
+    global _engine
+    _engine = LoxEngine(engine, optimize)
+
+def run_script(path: str) -> Tuple[str, List[str], List[str], int]:
+    """Runs one script in a worker; returns its path, output, errors and exit code."""
+    try:
+        with open(path, "r") as f:
+            source = f.read()
+    except OSError as error:
+        return path, [], [f"Cannot read {path}: {error.strerror}"], 66
+    result = _engine.run(source)
+    code = 0
+    if result.errors:
+        code = 65 if result.errors[0].kind == "syntax" else 70
+    return path, result.output, [str(error) for error in result.errors], code
+
+def find_scripts(paths: Iterable[str]) -> List[str]:
+    scripts = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                scripts.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".lox"))
+        else:
+            scripts.append(path)
+    return scripts
+
+def run_batch(paths: Iterable[str], engine: str = "tree", jobs: int = None, optimize: bool = True) -> int:
+    """Runs every script under paths on a pool of worker processes.
+
+    Each script's output is written to stdout under a header with its exit
+    code, in the order the scripts were given, as soon as it and every
+    script before it have finished. Returns the highest exit code.
+    """
+    scripts = find_scripts(paths)
+    jobs = jobs or os.cpu_count() or 1
+    # Workers take scripts a few at a time to cut down on round trips
+    chunksize = max(1, len(scripts) // (jobs * 8))
+    status = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(engine, optimize)) as pool:
+        for path, output, errors, code in pool.map(run_script, scripts, chunksize=chunksize):
+            print(f"== {path} (exit {code}) ==")
+            for line in output:
+                print(line)
+            sys.stdout.flush()
+            for error in errors:
+                print(error, file=sys.stderr)
+            status = max(status, code)
+    elapsed = time.perf_counter() - start
+    rate = len(scripts) / elapsed if elapsed else 0.0
+    print(f"{len(scripts)} scripts in {elapsed:.3f}s ({rate:.1f} scripts/sec)", file=sys.stderr)
+    return status
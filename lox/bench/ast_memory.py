@@ -0,0 +1,50 @@
+"""Measures the memory taken by parsed trees, as node objects and as a FlatTree.
+
+    python3 -m lox.bench.ast_memory [workload...]
+"""
+import sys
+import time
+import tracemalloc
+
+from lox.scanner import RegexScanner
+from lox.parser import Parser
+from lox.flat_ast import FlatTree
+from lox.bench.workloads import WORKLOADS
+
+def allocated(fn):
+    """Returns what fn returns and the bytes it left allocated."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    names = sys.argv[1:] or list(WORKLOADS)
+    for name in names:
+        if name not in WORKLOADS:
+            print(f"Unknown workload {name}; choose from {', '.join(WORKLOADS)}")
+            sys.exit(64)
+    for name in names:
+        tokens = RegexScanner(WORKLOADS[name]()).scan_tokens()
+        # Tokens exist before parsing, so only nodes and their lists are counted
+        stmts, tree_bytes = allocated(lambda: Parser(tokens).parse())
+        flat, flat_bytes = allocated(lambda: FlatTree(stmts))
+        build = timed(lambda: FlatTree(stmts))
+        rebuild = timed(flat.to_stmts)
+        nodes = len(flat)
+        print(
+            f"{name:10} {nodes:7} nodes  objects {tree_bytes / nodes:6.1f} B/node  "
+            f"flat {flat_bytes / nodes:6.1f} B/node  "
+            f"build {build * 1e3:7.2f} ms  rebuild {rebuild * 1e3:7.2f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measures per-node visitor dispatch overhead in the tree-walking interpreter.
+
+Runs the same parsed program with the class-keyed dispatch tables from
+lox.typedispatch and with the original string-building lookup, and reports
+the time spent per evaluated node.
+
+    python3 -m lox.bench.dispatch [script.lox]
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import List
+
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.lox_types import Expr
+from lox.statements import Stmt
+from lox.typedispatch import _methods, _qualname
+
+def arith_workload(lines: int = 2000) -> str:
+    """Arithmetic-heavy source in the spirit of arith.lox."""
+    return "\n".join(
+        f"{i} * 2 / 4 + 123 - 123 * ({i} - 1) <= {i}.5 * (2 + -{i});"
+        for i in range(lines)
+    )
+
+def count_nodes(node) -> int:
+    if isinstance(node, list):
+        return sum(count_nodes(child) for child in node)
+    if not isinstance(node, (Expr, Stmt)):
+        return 0
+    return 1 + sum(count_nodes(getattr(node, name)) for name in node.fields)
+
+def _legacy_visitor_impl(self, arg):
+    method = _methods[(_qualname(type(self)), type(arg))]
+    return method(self, arg)
+
+@contextmanager
+def legacy_dispatch(cls=Interpreter):
+    current = cls.visit
+    cls.visit = _legacy_visitor_impl
+    try:
+        yield
+    finally:
+        cls.visit = current
+
+def time_interpret(stmts: List[Stmt], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter()
+        start = time.perf_counter()
+        interpreter.interpret(stmts)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.bench.dispatch [script]")
+        sys.exit(64)
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "r") as f:
+            source = f.read()
+    else:
+        source = arith_workload()
+
+    stmts = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver().resolve(stmts)
+    nodes = count_nodes(stmts)
+    repeat = 5
+
+    with legacy_dispatch():
+        before = time_interpret(stmts, repeat)
+    after = time_interpret(stmts, repeat)
+
+    print(f"nodes evaluated: {nodes}")
+    print(f"before: {before * 1e3:8.2f} ms  {before / nodes * 1e9:7.1f} ns/node")
+    print(f"after:  {after * 1e3:8.2f} ms  {after / nodes * 1e9:7.1f} ns/node")
+    print(f"speedup: {before / after:.2f}x")
+
+if __name__ == "__main__":
+    main()
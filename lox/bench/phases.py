@@ -0,0 +1,130 @@
+"""Times each pipeline phase on the generated workloads and reports memory peaks.
+
+Scanning, parsing, resolving and interpreting are timed separately (best of
+--repeat runs), then run once more under tracemalloc for the peak memory of
+each phase. Results can be written as JSON to compare versions.
+
+    python3 -m lox.bench.phases [--engine E] [--repeat N] [--scale X] [--json FILE] [workload...]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict
+
+import lox
+from lox.core import ENGINES
+from lox.scanner import RegexScanner
+from lox.parser import Parser
+from lox.optimizer import Optimizer
+from lox.resolver import Resolver
+from lox.bench.workloads import WORKLOADS
+
+PHASES = ("scan", "parse", "resolve", "interpret")
+
+def discard(text: str) -> None:
+    pass
+
+def run_phases(source: str, engine: str, mark) -> None:
+    """Runs source through the pipeline, calling mark(phase) as each phase ends."""
+    tokens = RegexScanner(source).scan_tokens()
+    mark("scan")
+    stmts = Parser(tokens).parse()
+    mark("parse")
+    stmts = Optimizer().optimize(stmts)
+    Resolver().resolve(stmts)
+    mark("resolve")
+    ENGINES[engine](discard).interpret(stmts)
+    mark("interpret")
+
+class Timer:
+    def __init__(self):
+        self.results: Dict[str, float] = {}
+        self.last = time.perf_counter()
+
+    def __call__(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.results[phase] = now - self.last
+        self.last = now
+
+class PeakMemory:
+    """Records how far traced memory rose above its level at the start of each phase."""
+
+    def __init__(self):
+        tracemalloc.reset_peak()
+        self.results: Dict[str, int] = {}
+        self.base, _ = tracemalloc.get_traced_memory()
+
+    def __call__(self, phase: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.results[phase] = peak - self.base
+        tracemalloc.reset_peak()
+        self.base = current
+
+def measure(source: str, engine: str = "tree", repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    times = {phase: float("inf") for phase in PHASES}
+    for _ in range(repeat):
+        timer = Timer()
+        run_phases(source, engine, timer)
+        for phase, elapsed in timer.results.items():
+            times[phase] = min(times[phase], elapsed)
+
+    tracemalloc.start()
+    try:
+        memory = PeakMemory()
+        run_phases(source, engine, memory)
+    finally:
+        tracemalloc.stop()
+    return {"seconds": times, "peak_bytes": memory.results}
+
+def scaled(name: str, scale: float) -> str:
+    generate = WORKLOADS[name]
+    if scale == 1.0:
+        return generate()
+    defaults = generate.__defaults__
+    # Only the first parameter (the statement or block count) grows, so the
+    # shape of each statement stays the same
+    return generate(max(1, int(defaults[0] * scale)), *defaults[1:])
+
+def main():
+    parser = argparse.ArgumentParser(prog="python3 -m lox.bench.phases")
+    parser.add_argument("--engine", choices=ENGINES, default="tree")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every workload's size")
+    parser.add_argument("--json", metavar="FILE", help="also write results to FILE, or stdout for -")
+    parser.add_argument("workloads", nargs="*", metavar="workload", help=", ".join(WORKLOADS))
+    args = parser.parse_args()
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error(f"unknown workload {name!r}")
+
+    report = {
+        "version": lox.__version__,
+        "python": platform.python_version(),
+        "engine": args.engine,
+        "workloads": {},
+    }
+    for name in args.workloads or WORKLOADS:
+        source = scaled(name, args.scale)
+        results = measure(source, args.engine, args.repeat)
+        results["source_bytes"] = len(source)
+        report["workloads"][name] = results
+        if args.json != "-":
+            print(f"{name:10} {len(source) / 1024:8.0f} KB")
+            for phase in PHASES:
+                print(
+                    f"  {phase:10} {results['seconds'][phase] * 1e3:9.2f} ms"
+                    f"  peak {results['peak_bytes'][phase] / 1024:9.1f} KB"
+                )
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compares the CPython backend against the tree-walking interpreter.
+
+Compiling costs CPython's compile() over the generated source, which takes
+longer than one tree-walk of the same statements, so the backend wins on
+programs that run more than once, as Programs on an InterpreterPool do.
+The break-even column is the number of runs after which compiling once
+and running the code object beats walking the tree every time.
+
+    python3 -m lox.bench.pycompiler [script.lox]
+"""
+import math
+import sys
+from typing import Dict
+
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.pycompiler import PythonCompiler
+from lox.bench.vm import best_of, locals_workload
+from lox.bench.workloads import arithmetic_chains, nested_expressions, print_heavy
+
+def compare(source: str, repeat: int = 5) -> Dict[str, float]:
+    stmts = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver().resolve(stmts)
+    tree = best_of(lambda: Interpreter(lambda text: None).interpret(stmts), repeat)
+    compile_time = best_of(lambda: PythonCompiler().compile(stmts), repeat)
+    program = PythonCompiler().compile(stmts)
+    python = best_of(lambda: program.run({}, Interpreter.stringify, lambda text: None), repeat)
+    return {"tree": tree, "compile": compile_time, "python": python}
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.bench.pycompiler [script]")
+        sys.exit(64)
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "r") as f:
+            workloads = {sys.argv[1]: f.read()}
+    else:
+        workloads = {
+            "arithmetic": arithmetic_chains(),
+            "nested": nested_expressions(),
+            "prints": print_heavy(),
+            "locals": locals_workload(),
+        }
+
+    for name, source in workloads.items():
+        times = compare(source)
+        saved = times["tree"] - times["python"]
+        runs = math.ceil(times["compile"] / saved) if saved > 0 else math.inf
+        print(
+            f"{name:10} tree {times['tree'] * 1e3:8.2f} ms  "
+            f"python {times['python'] * 1e3:8.2f} ms (+{times['compile'] * 1e3:.2f} ms compile)  "
+            f"{times['tree'] / times['python']:.2f}x  break-even after {runs} runs"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compares the character-at-a-time Scanner with RegexScanner on generated sources.
+
+    python3 -m lox.bench.scanner [megabytes]
+"""
+import sys
+import time
+
+from lox.scanner import Scanner, RegexScanner
+
+SNIPPET = """var total = 0;
+// running sum of a few literals
+{
+    var step = 1.5 * (2 - 0.25) / 3;
+    total = total + step;
+    print "step " + step;
+}
+/* block comment /* nested */ spanning
+   two lines */
+print total >= 10 == !false;
+"""
+
+def generate_source(megabytes: float) -> str:
+    copies = int(megabytes * 1024 * 1024 / len(SNIPPET)) + 1
+    return SNIPPET * copies
+
+def time_scan(cls, source: str) -> float:
+    start = time.perf_counter()
+    cls(source).scan_tokens()
+    return time.perf_counter() - start
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.bench.scanner [megabytes]")
+        sys.exit(64)
+    megabytes = float(sys.argv[1]) if len(sys.argv) == 2 else 4
+    source = generate_source(megabytes)
+    tokens = len(RegexScanner(source).scan_tokens())
+    size = len(source) / (1024 * 1024)
+
+    before = time_scan(Scanner, source)
+    after = time_scan(RegexScanner, source)
+    print(f"source: {size:.1f} MB, {tokens} tokens")
+    print(f"Scanner:      {before:7.2f} s  {size / before:6.2f} MB/s")
+    print(f"RegexScanner: {after:7.2f} s  {size / after:6.2f} MB/s")
+    print(f"speedup: {before / after:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measures self-specializing Binary nodes on repeatedly executed statements.
+
+Specialization pays off when the same AST runs more than once, as with a
+Program executed on an InterpreterPool, so each workload is prepared once
+and run --runs times on one interpreter, with and without specializing
+Binary nodes.
+
+    python3 -m lox.bench.specialize [runs]
+"""
+import sys
+import time
+
+from lox.scanner import RegexScanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.bench.workloads import arithmetic_chains, nested_expressions
+
+class GenericInterpreter(Interpreter):
+    def specialize(self, expr, left, right) -> None:
+        pass
+
+def strings_workload(statements: int = 200, terms: int = 50) -> str:
+    return 'var s = "ab";\n' + "\n".join(
+        f"print s {' + s' * terms} + \"{i}\";" for i in range(statements)
+    )
+
+def time_runs(cls, source: str, runs: int) -> float:
+    stmts = Parser(RegexScanner(source).scan_tokens()).parse()
+    Resolver().resolve(stmts)
+    interpreter = cls(lambda text: None)
+    prepared = interpreter.prepare(stmts)
+    start = time.perf_counter()
+    for _ in range(runs):
+        interpreter.reset()
+        interpreter.run(prepared)
+    return time.perf_counter() - start
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.bench.specialize [runs]")
+        sys.exit(64)
+    runs = int(sys.argv[1]) if len(sys.argv) == 2 else 20
+    workloads = {
+        "arithmetic": arithmetic_chains(),
+        "nested": nested_expressions(),
+        "strings": strings_workload(),
+    }
+    for name, source in workloads.items():
+        generic = time_runs(GenericInterpreter, source, runs)
+        specialized = time_runs(Interpreter, source, runs)
+        print(
+            f"{name:10} generic {generic / runs * 1e3:8.2f} ms/run  "
+            f"specialized {specialized / runs * 1e3:8.2f} ms/run  "
+            f"{generic / specialized:.2f}x"
+        )
+
+if __name__ == "__main__":
+    main()
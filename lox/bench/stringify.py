@@ -0,0 +1,70 @@
+"""Measures the cached stringify on a print-heavy workload.
+
+Each run interprets the parsed workload with its output discarded, once
+with the value formatting Interpreter used before lox.formatting and once
+with the cached one, and times formatting the printed values on their own.
+
+    python3 -m lox.bench.stringify [runs]
+"""
+import sys
+import time
+
+from lox.scanner import RegexScanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.formatting import stringify
+from lox.bench.workloads import print_heavy
+
+def plain_stringify(val) -> str:
+    if val is None:
+        return "nil"
+    if type(val) == float and val.is_integer():
+        return str(int(val))
+    return str(val)
+
+class PlainInterpreter(Interpreter):
+    stringify = staticmethod(plain_stringify)
+
+def compare(plain, cached, runs: int):
+    """Best times of plain and cached, taken in alternation so drift hits both."""
+    best = [float("inf"), float("inf")]
+    for _ in range(runs):
+        for i, fn in enumerate((plain, cached)):
+            start = time.perf_counter()
+            fn()
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.bench.stringify [runs]")
+        sys.exit(64)
+    runs = int(sys.argv[1]) if len(sys.argv) == 2 else 10
+    stmts = Parser(RegexScanner(print_heavy()).scan_tokens()).parse()
+    Resolver().resolve(stmts)
+    # Collects the printed values for timing stringify on its own. Each timed
+    # run gets a fresh interpreter, so none starts with specialized nodes,
+    # but this run does warm the float text cache, as a long script would.
+    values = []
+    Interpreter(lambda text: values.append(float(text))).interpret(stmts)
+
+    def interpret(cls):
+        return lambda: cls(lambda text: None).interpret(stmts)
+
+    def format_all(fn):
+        return lambda: [fn(val) for val in values]
+
+    for name, plain, cached in (
+        ("interpret", interpret(PlainInterpreter), interpret(Interpreter)),
+        ("stringify", format_all(plain_stringify), format_all(stringify)),
+    ):
+        before, after = compare(plain, cached, runs)
+        print(
+            f"{name:10} plain {before * 1e3:8.2f} ms  "
+            f"cached {after * 1e3:8.2f} ms  "
+            f"{before / after:.2f}x  ({len(values)} values)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compares the bytecode VM against the tree-walking interpreter.
+
+    python3 -m lox.bench.vm [script.lox]
+"""
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Dict
+
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.vm import Compiler, VM
+from lox.bench.dispatch import arith_workload
+
+def nested_workload(lines: int = 500, depth: int = 40) -> str:
+    """Deeply parenthesized expressions, one per statement."""
+    expr = "1"
+    for i in range(depth):
+        expr = f"({expr} + {i})" if i % 2 else f"({expr} * 1)"
+    return "\n".join(f"{expr} - {i};" for i in range(lines))
+
+def locals_workload(blocks: int = 500) -> str:
+    """Blocks that declare, read and assign a handful of locals."""
+    block = "{ var a = 1; var b = 2; var c = a + b; a = c * b; b = a - c; { var a = b; c = a + c; } }"
+    return "var g = 0;\n" + "\n".join(f"{block} g = g + {i};" for i in range(blocks))
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def compare(source: str, repeat: int = 5) -> Dict[str, float]:
+    stmts = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver().resolve(stmts)
+    tree = best_of(lambda: Interpreter().interpret(stmts), repeat)
+    compile_time = best_of(lambda: Compiler().compile(stmts), repeat)
+    chunk = Compiler().compile(stmts)
+    vm = best_of(lambda: VM({}, Interpreter().stringify).run(chunk), repeat)
+    return {"tree": tree, "compile": compile_time, "vm": vm}
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.bench.vm [script]")
+        sys.exit(64)
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "r") as f:
+            workloads = {sys.argv[1]: f.read()}
+    else:
+        workloads = {
+            "arith": arith_workload(),
+            "nested": nested_workload(),
+            "locals": locals_workload(),
+        }
+
+    for name, source in workloads.items():
+        with redirect_stdout(io.StringIO()):
+            times = compare(source)
+        print(
+            f"{name:10} tree {times['tree'] * 1e3:8.2f} ms  "
+            f"vm {times['vm'] * 1e3:8.2f} ms (+{times['compile'] * 1e3:.2f} ms compile)  "
+            f"{times['tree'] / times['vm']:.2f}x"
+        )
+
+if __name__ == "__main__":
+    main()
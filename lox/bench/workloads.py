@@ -0,0 +1,53 @@
+"""Generated Lox sources that each stress one part of the pipeline."""
+from typing import Callable, Dict
+
+# Workloads read this variable so constant folding cannot remove their work
+PRELUDE = "var x = 1.5;\n"
+
+def nested_expressions(statements: int = 200, depth: int = 100) -> str:
+    """Parenthesized expressions nested depth levels deep."""
+    expr = "x"
+    for i in range(depth):
+        expr = f"({expr} + {i})" if i % 2 else f"(-{expr} * x)"
+    return PRELUDE + "\n".join(f"print {expr} - {i};" for i in range(statements))
+
+def arithmetic_chains(statements: int = 50, terms: int = 400) -> str:
+    """Long flat chains of binary operators, one per statement."""
+    operators = ["+", "-", "*", "/"]
+    lines = []
+    for i in range(statements):
+        chain = " ".join(f"{operators[j % 4]} x" if j % 3 else f"{operators[j % 4]} {j % 7 + 1}.5" for j in range(terms))
+        lines.append(f"print {i} {chain};")
+    return PRELUDE + "\n".join(lines)
+
+def many_variables(variables: int = 2000, blocks: int = 200) -> str:
+    """Lots of globals, then blocks that read and assign them through locals."""
+    lines = [f"var v{i} = {i};" for i in range(variables)]
+    for i in range(blocks):
+        a, b = i % variables, (i * 7) % variables
+        lines.append(f"{{ var t = v{a} + v{b}; v{a} = t * 2; {{ var u = t - v{b}; v{b} = u; }} }}")
+    lines.append(f"print v0 + v{variables - 1};")
+    return "\n".join(lines)
+
+def comment_blocks(blocks: int = 200, lines: int = 200, nesting: int = 3) -> str:
+    """Huge, nested block comments between a few statements."""
+    body = "\n".join(f" * line {i} of a long comment with // and \"quotes\"" for i in range(lines))
+    comment = "/*" * nesting + "\n" + body + "\n" + "*/" * nesting
+    return "\n".join(f"{comment}\nprint {i};" for i in range(blocks))
+
+def print_heavy(statements: int = 2000, loops: int = 10) -> str:
+    """Print statements of counters, sums and fractions, as output-bound scripts run them."""
+    lines = ["var i = 0;"]
+    for _ in range(loops):
+        lines.append("i = 0;")
+        for j in range(statements // loops):
+            lines.append(f"print i; print i * 1000 + {j}; print x * {j}; i = i + 1;")
+    return PRELUDE + "\n".join(lines)
+
+WORKLOADS: Dict[str, Callable[[], str]] = {
+    "nested": nested_expressions,
+    "arithmetic": arithmetic_chains,
+    "variables": many_variables,
+    "comments": comment_blocks,
+    "prints": print_heavy,
+}
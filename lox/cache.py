@@ -0,0 +1,176 @@
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+import lox
+from lox.lox_types import BINARY, GROUPING, LITERAL, UNARY, VARIABLE, ASSIGNMENT
+from lox.lox_types import Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.tokens import Token, TokenType
+from lox.statements import PRINT, EXPRESSION, VAR, BLOCK
+from lox.statements import Print, Expression, Var, Stmt, Block
+
+CACHE_DIRECTORY = "__loxcache__"
+MAGIC = b"LOXC\x01"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_TOKEN_TYPES = {type.value: type for type in TokenType}
+
+class AstEncoder:
+    """Flattens statements into nested tuples of marshal-able values, each
+    starting with the node's kind."""
+
+    def token(self, token: Token):
+        return (token.type.value, token.lexeme, token.line)
+
+    def encode(self, node):
+        return self.encoders[node.kind](self, node)
+
+    def binary(self, expr: Binary):
+        return (BINARY, self.encode(expr.left), self.token(expr.operator), self.encode(expr.right))
+
+    def grouping(self, expr: Grouping):
+        return (GROUPING, self.encode(expr.expression))
+
+    def literal(self, expr: Literal):
+        return (LITERAL, expr.value)
+
+    def unary(self, expr: Unary):
+        return (UNARY, self.token(expr.operator), self.encode(expr.right))
+
+    def variable(self, expr: Variable):
+        return (VARIABLE, self.token(expr.name))
+
+    def assignment(self, expr: Assignment):
+        return (ASSIGNMENT, self.token(expr.name), self.encode(expr.value))
+
+    def print(self, stmt: Print):
+        return (PRINT, self.encode(stmt.expr))
+
+    def expression(self, stmt: Expression):
+        return (EXPRESSION, self.encode(stmt.expr))
+
+    def var(self, stmt: Var):
+        initializer = None if stmt.initializer is None else self.encode(stmt.initializer)
+        return (VAR, self.token(stmt.name), initializer)
+
+    def block(self, stmt: Block):
+        return (BLOCK, tuple(self.encode(s) for s in stmt.stmts))
+
+    encoders = {
+        BINARY: binary,
+        GROUPING: grouping,
+        LITERAL: literal,
+        UNARY: unary,
+        VARIABLE: variable,
+        ASSIGNMENT: assignment,
+        PRINT: print,
+        EXPRESSION: expression,
+        VAR: var,
+        BLOCK: block,
+    }
+
+def _token(data) -> Token:
+    type, lexeme, line = data
+    return Token(_TOKEN_TYPES[type], sys.intern(lexeme), None, line)
+
+_DECODERS = {
+    BINARY: lambda data: Binary(decode(data[1]), _token(data[2]), decode(data[3])),
+    GROUPING: lambda data: Grouping(decode(data[1])),
+    LITERAL: lambda data: Literal(data[1]),
+    UNARY: lambda data: Unary(_token(data[1]), decode(data[2])),
+    VARIABLE: lambda data: Variable(_token(data[1])),
+    ASSIGNMENT: lambda data: Assignment(_token(data[1]), decode(data[2])),
+    PRINT: lambda data: Print(decode(data[1])),
+    EXPRESSION: lambda data: Expression(decode(data[1])),
+    VAR: lambda data: Var(_token(data[1]), None if data[2] is None else decode(data[2])),
+    BLOCK: lambda data: Block([decode(stmt) for stmt in data[1]]),
+}
+
+def decode(data):
+    decoder = _DECODERS.get(data[0])
+    if decoder is None:
+        raise ValueError(f"Unknown node tag {data[0]}")
+    return decoder(data)
+
+class AstCache:
+    """On-disk cache of parsed statement lists, keyed by source hash.
+
+    Entries are named after a hash of the source together with the lox and
+    Python versions, so editing a script or upgrading either simply misses.
+    A hit refreshes the entry's mtime, and once the directory grows past
+    max_bytes the least recently used entries are evicted. Cache problems
+    are never fatal; the caller just parses again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def for_script(cls, path: str, max_bytes: int = DEFAULT_MAX_BYTES) -> "AstCache":
+        return cls(os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRECTORY), max_bytes)
+
+    def path(self, source) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{lox.__version__}:{sys.implementation.cache_tag}:".encode())
+        digest.update(source.encode("utf-8") if isinstance(source, str) else source)
+        return os.path.join(self.directory, digest.hexdigest() + ".loxc")
+
+    def load(self, source) -> Optional[List[Stmt]]:
+        path = self.path(source)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if not data.startswith(MAGIC):
+                return None
+            stmts = [decode(stmt) for stmt in marshal.loads(data[len(MAGIC):])]
+            os.utime(path)
+        except (OSError, EOFError, ValueError, TypeError, IndexError, KeyError):
+            return None
+        return stmts
+
+    def store(self, source, stmts: List[Stmt]) -> None:
+        encoder = AstEncoder()
+        try:
+            data = MAGIC + marshal.dumps(tuple(encoder.encode(stmt) for stmt in stmts))
+        except (RecursionError, ValueError):
+            # Nested too deeply to encode or marshal; such scripts go uncached
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Written aside and renamed so concurrent runs never read a partial entry
+            os.replace(tmp, self.path(source))
+            self.evict()
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".loxc"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
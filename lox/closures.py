@@ -0,0 +1,210 @@
+from typing import Callable, List
+
+from lox import hooks
+from lox.lox_types import Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.tokens import TokenType, Token
+from lox.typedispatch import visitor
+from lox.statements import Print, Expression, Var, Stmt, Block
+from lox.environment import Environment
+from lox.errors import RuntimeError
+from lox.interpreter import Interpreter
+
+# Every compiled node is a callable taking the environment it runs in.
+Code = Callable[[Environment], object]
+
+def _minus(operator: Token, left: Code, right: Code) -> Code:
+    def minus(env):
+        l, r = left(env), right(env)
+        if type(l) is float and type(r) is float:
+            return l - r
+        raise RuntimeError(operator, "Operands must be numbers.")
+    return minus
+
+def _plus(operator: Token, left: Code, right: Code) -> Code:
+    def plus(env):
+        l, r = left(env), right(env)
+        tl, tr = type(l), type(r)
+        if (tl is float and tr is float) or (tl is str and tr is str):
+            return l + r
+        if (tl is str and tr is float) or (tl is float and tr is str):
+            return str(l) + str(r)
+        raise RuntimeError(operator, "Operands must be two numbers or two strings.")
+    return plus
+
+def _star(operator: Token, left: Code, right: Code) -> Code:
+    def star(env):
+        l, r = left(env), right(env)
+        if type(l) is float and type(r) is float:
+            return l * r
+        raise RuntimeError(operator, "Operands must be numbers.")
+    return star
+
+def _slash(operator: Token, left: Code, right: Code) -> Code:
+    def slash(env):
+        l, r = left(env), right(env)
+        if type(l) is not float or type(r) is not float:
+            raise RuntimeError(operator, "Operands must be numbers.")
+        if r == 0:
+            raise RuntimeError(operator, "Right operand must be non-zero")
+        return l / r
+    return slash
+
+def _greater(operator: Token, left: Code, right: Code) -> Code:
+    def greater(env):
+        l, r = left(env), right(env)
+        if type(l) is float and type(r) is float:
+            return l > r
+        raise RuntimeError(operator, "Operands must be numbers.")
+    return greater
+
+def _greater_equal(operator: Token, left: Code, right: Code) -> Code:
+    def greater_equal(env):
+        l, r = left(env), right(env)
+        if type(l) is float and type(r) is float:
+            return l >= r
+        raise RuntimeError(operator, "Operands must be numbers.")
+    return greater_equal
+
+def _less(operator: Token, left: Code, right: Code) -> Code:
+    def less(env):
+        l, r = left(env), right(env)
+        if type(l) is float and type(r) is float:
+            return l < r
+        raise RuntimeError(operator, "Operands must be numbers.")
+    return less
+
+def _less_equal(operator: Token, left: Code, right: Code) -> Code:
+    def less_equal(env):
+        l, r = left(env), right(env)
+        if type(l) is float and type(r) is float:
+            return l <= r
+        raise RuntimeError(operator, "Operands must be numbers.")
+    return less_equal
+
+def _bang_equal(operator: Token, left: Code, right: Code) -> Code:
+    def bang_equal(env):
+        return left(env) != right(env)
+    return bang_equal
+
+def _equal_equal(operator: Token, left: Code, right: Code) -> Code:
+    def equal_equal(env):
+        return left(env) == right(env)
+    return equal_equal
+
+BINARY = {
+    TokenType.MINUS: _minus,
+    TokenType.PLUS: _plus,
+    TokenType.STAR: _star,
+    TokenType.SLASH: _slash,
+    TokenType.GREATER: _greater,
+    TokenType.GREATER_EQUAL: _greater_equal,
+    TokenType.LESS: _less,
+    TokenType.LESS_EQUAL: _less_equal,
+    TokenType.BANG_EQUAL: _bang_equal,
+    TokenType.EQUAL_EQUAL: _equal_equal,
+}
+
+class ClosureInterpreter(Interpreter):
+    """Compiles each statement once into nested closures and runs those.
+
+    Operator branches and node dispatch are resolved while compiling, so
+    executing the program only calls the specialized closures.
+    """
+
+    def prepare(self, stmts: List[Stmt]) -> List[Code]:
+        return [self.compile(stmt) for stmt in stmts]
+
+    def run(self, program: List[Code]):
+        env = self.environment
+        try:
+            for stmt in program:
+                stmt(env)
+        except RuntimeError as error:
+            self.runtime_error(error)
+
+    @visitor(Block)
+    def compile(self, block: Block) -> Code:
+        body = tuple(self.compile(stmt) for stmt in block.stmts)
+        def run_block(env):
+            inner = Environment(env)
+            if hooks.listeners["environment"]:
+                hooks.emit("environment", inner)
+            for stmt in body:
+                stmt(inner)
+        return run_block
+
+    @visitor(Print)
+    def compile(self, stmt: Print) -> Code:
+        value = self.compile(stmt.expr)
+        stringify = self.stringify
+        # The sink is looked up per call so compiled programs follow reassignment
+        interpreter = self
+        def run_print(env):
+            interpreter.out(stringify(value(env)))
+        return run_print
+
+    @visitor(Expression)
+    def compile(self, stmt: Expression) -> Code:
+        # Statement results are discarded, so the expression runs as-is
+        return self.compile(stmt.expr)
+
+    @visitor(Var)
+    def compile(self, var: Var) -> Code:
+        name = var.name.lexeme
+        if var.initializer is None:
+            def run_var(env):
+                env.define(name, None)
+        else:
+            initializer = self.compile(var.initializer)
+            def run_var(env):
+                env.define(name, initializer(env))
+        return run_var
+
+    @visitor(Variable)
+    def compile(self, expr: Variable) -> Code:
+        name = expr.name
+        def variable(env):
+            return env.get(name)
+        return variable
+
+    @visitor(Assignment)
+    def compile(self, expr: Assignment) -> Code:
+        name = expr.name
+        value = self.compile(expr.value)
+        def assignment(env):
+            val = value(env)
+            env.assign(name, val)
+            return val
+        return assignment
+
+    @visitor(Binary)
+    def compile(self, expr: Binary) -> Code:
+        make = BINARY[expr.operator.type]
+        return make(expr.operator, self.compile(expr.left), self.compile(expr.right))
+
+    @visitor(Unary)
+    def compile(self, expr: Unary) -> Code:
+        operator = expr.operator
+        right = self.compile(expr.right)
+        if operator.type == TokenType.MINUS:
+            def negate(env):
+                r = right(env)
+                if type(r) is float:
+                    return -r
+                raise RuntimeError(operator, "Operand must be a number")
+            return negate
+        is_truthy = self.is_truthy
+        def bang(env):
+            return not is_truthy(right(env))
+        return bang
+
+    @visitor(Grouping)
+    def compile(self, expr: Grouping) -> Code:
+        return self.compile(expr.expression)
+
+    @visitor(Literal)
+    def compile(self, expr: Literal) -> Code:
+        value = expr.value
+        def literal(env):
+            return value
+        return literal
@@ -1,44 +1,237 @@
+import gc
+import mmap
 import sys
+import threading
+from contextlib import contextmanager
 
-from lox import scanner
+from lox import hooks, scanner
 from lox.tokens import Token, TokenType
-from lox.parser import Parser
+from lox.parser import Parser, StreamParser
+from lox.resolver import Resolver
+from lox.optimizer import Optimizer
+from lox.cache import AstCache
 from lox.ast_printer import NewAstPrinter, AstRPNPrinter
+from lox.errors import LoxError, RuntimeError
+from lox.lox_types import Expr
+from lox.statements import Stmt
+from lox.output import BufferedOutput
 from lox.interpreter import Interpreter
+from lox.profiler import ProfilingInterpreter
+from lox.closures import ClosureInterpreter
+from lox.pycompiler import PythonInterpreter
+from lox.vm import VMInterpreter
+from lox.stack import StackInterpreter
 
 had_error = False
 had_runtime_error = False
 
-def run_file(file: str) -> None:
+# Threads running code for a LoxEngine collect their errors here instead of
+# printing them and setting the flags above
+_collector = threading.local()
+
+# Execution engines selectable with `plox --engine`
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "python": PythonInterpreter,
+    "vm": VMInterpreter,
+    "stack": StackInterpreter,
+}
+
+# Engines whose blocks take their environments from Interpreter.scopes, the
+# ScopePool that --scope-stats reports on
+SCOPE_ENGINES = ("tree", "stack")
+
+def run_file(
+    file: str,
+    engine: str = "tree",
+    scope_stats: bool = False,
+    stream: bool = False,
+    optimize: bool = True,
+    dump_ast: bool = False,
+    cache: bool = True,
+    profile: bool = False,
+    profile_stacks: str = None,
+    jobs: int = None,
+    parallel_parse: bool = False,
+) -> None:
     global had_error
-    with open(file, "r") as f:
-        bytes = f.read()
-    run(bytes)
+    if (profile or profile_stacks) and engine != "tree":
+        raise ValueError(f"Profiling runs the tree engine, not {engine!r}")
+    if scope_stats and engine not in SCOPE_ENGINES:
+        raise ValueError(f"The {engine!r} engine keeps no scope statistics")
+    # Printed lines go out in batches; the interpreter flushes them when it
+    # stops and before reporting a runtime error
+    out = BufferedOutput()
+    interpreter = (ProfilingInterpreter if profile or profile_stacks else ENGINES[engine])(out)
+    # Scripts build large trees and closures that hold no cycles, which the
+    # collector would only rescan as they grow. The CLI runs one script on one
+    # thread, so it is safe to pause collection for the whole run here.
+    with collection_paused():
+        if stream:
+            with open(file, "r") as f:
+                interpreter = execute(StreamParser(scanner.StreamScanner(f)), engine, optimize, dump_ast, interpreter)
+        else:
+            with map_file(file) as source:
+                ast_cache = AstCache.for_script(file) if cache else None
+                stmts = ast_cache.load(source) if ast_cache else None
+                if stmts is None:
+                    with hooks.phase("scan"):
+                        if jobs:
+                            from lox.parallel import ParallelScanner
+
+                            tokens = ParallelScanner(source, jobs).scan_buffer()
+                        else:
+                            tokens = scanner.BytesScanner(source).scan_buffer()
+                    with hooks.phase("parse"):
+                        # Parsing on workers measured slower than here, so it is opt-in;
+                        # ParallelParser uses up to jobs workers, or one per CPU
+                        if parallel_parse:
+                            from lox.parallel import ParallelParser
+
+                            stmts = ParallelParser(tokens, jobs).parse()
+                        else:
+                            stmts = StreamParser(tokens).parse()
+                    if ast_cache and not had_error:
+                        ast_cache.store(source, stmts)
+                interpreter = run_statements(stmts, engine, optimize, dump_ast, interpreter)
+    if scope_stats and interpreter is not None:
+        for name, value in interpreter.scopes.stats().items():
+            print(f"{name}: {value}", file=sys.stderr)
+    if profile and interpreter is not None:
+        interpreter.profile.report(sys.stderr)
+    if profile_stacks and interpreter is not None:
+        interpreter.profile.write_stacks(profile_stacks)
     if had_error:
         sys.exit(65)
     if had_runtime_error:
         sys.exit(70)
 
-def run_prompt() -> None:
-    global had_error
+@contextmanager
+def collection_paused():
+    """Turns off the cyclic garbage collector for the block, unless it was off already."""
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+@contextmanager
+def map_file(file: str):
+    """Memory-maps a script read-only; empty files, which cannot be mapped, give b''."""
+    with open(file, "rb") as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        with source:
+            yield source
+
+def run_prompt(engine: str = "tree", timings: bool = False) -> None:
+    from lox.repl import Session
+
+    session = Session(engine)
     while True:
-        print("> ", end="")
-        line = input()
-        if not line:
+        print("... " if session.pending() else "> ", end="")
+        try:
+            line = input()
+        except EOFError:
             break
-        run(line)
-        had_error = False
+        if not line and not session.pending():
+            break
+        if session.feed(line) and timings:
+            print(
+                "[scan %.3f ms, parse %.3f ms, execute %.3f ms]"
+                % tuple(session.timings[phase] * 1e3 for phase in ("scan", "parse", "execute")),
+                file=sys.stderr,
+            )
 
-def run(source: str) -> None:
-    global had_error
-    sc = scanner.Scanner(source)
-    tokens = sc.scan_tokens()
-    p = Parser(tokens)
-    stmts = p.parse()
+def run(source: str, engine: str = "tree") -> Interpreter:
+    with hooks.phase("scan"):
+        tokens = scanner.RegexScanner(source).scan_buffer()
+    return execute(StreamParser(tokens), engine)
+
+def execute(
+    p: Parser,
+    engine: str = "tree",
+    optimize: bool = True,
+    dump_ast: bool = False,
+    interpreter: Interpreter = None,
+) -> Interpreter:
+    # A streaming parser scans as it goes, so this includes scanning its input
+    with hooks.phase("parse"):
+        stmts = p.parse()
+    return run_statements(stmts, engine, optimize, dump_ast, interpreter)
+
+def run_statements(
+    stmts,
+    engine: str = "tree",
+    optimize: bool = True,
+    dump_ast: bool = False,
+    interpreter: Interpreter = None,
+) -> Interpreter:
     if had_error:
         return
-    i = Interpreter()
-    i.interpret(stmts)
+    if dump_ast:
+        dump("before", stmts)
+    if optimize:
+        with hooks.phase("optimize"):
+            stmts = Optimizer().optimize(stmts)
+        if dump_ast:
+            dump("after", stmts)
+    with hooks.phase("resolve"):
+        Resolver().resolve(stmts)
+    i = interpreter or ENGINES[engine]()
+    with hooks.phase("execute"):
+        try:
+            i.interpret(stmts)
+        except RecursionError:
+            nested_too_deeply(i, stmts)
+    return i
+
+def nested_too_deeply(interpreter: Interpreter, stmts) -> None:
+    """Reports the RecursionError interpreter raised on stmts as a runtime error.
+
+    The parser keeps blocks shallow enough for the stack engine, so when any
+    other engine runs out of stack it is on an expression, which the stack
+    engine evaluates without recursing.
+    """
+    if isinstance(interpreter, StackInterpreter):
+        message = "Statements nested too deeply."
+    else:
+        message = "Expression nested too deeply for this engine; run it with --engine stack."
+    runtime_error(RuntimeError(deepest_token(stmts), message))
+
+def deepest_token(stmts) -> Token:
+    """The token nested deepest in stmts, found without recursing."""
+    deepest = Token(TokenType.EOF, "", None, 1)
+    most = -1
+    work = [(stmt, 0) for stmt in stmts]
+    while work:
+        node, depth = work.pop()
+        for name in node.fields:
+            value = getattr(node, name)
+            if isinstance(value, (Expr, Stmt)):
+                work.append((value, depth + 1))
+            elif isinstance(value, list):
+                work.extend((child, depth + 1) for child in value)
+            elif isinstance(value, Token) and depth > most:
+                deepest = value
+                most = depth
+    return deepest
+
+def dump(title: str, stmts) -> None:
+    printer = NewAstPrinter()
+    print(f"== {title} ==", file=sys.stderr)
+    for stmt in stmts:
+        try:
+            text = printer.print(stmt)
+        except RecursionError:
+            text = "(statement nested too deeply to print)"
+        print(text, file=sys.stderr)
 
 def error(line: int, message: str) -> None:
     report(line, "", message)
@@ -50,11 +243,31 @@ def error_token(token: Token, message: str):
         report(token.line,  f"at '{token.lexeme}'", message)
 
 def report(line: int, where: str, message: str) -> None:
+    errors = getattr(_collector, "errors", None)
+    if errors is not None:
+        errors.append(LoxError("syntax", line, message, where))
+        return
     print("[line %s] Error %s: %s" % (line, where, message), file=sys.stderr)
     global had_error
     had_error = True
     print()
 
 def runtime_error(error):
+    hooks.emit("runtime_error", error)
+    errors = getattr(_collector, "errors", None)
+    if errors is not None:
+        errors.append(LoxError("runtime", error.token.line, error.message))
+        return
     print(f"{error.message}\n[line {error.token.line}]+ ")
+    global had_runtime_error
     had_runtime_error = True
+
+@contextmanager
+def collect_errors(errors: list):
+    """Appends errors reported on this thread to errors as LoxErrors instead."""
+    previous = getattr(_collector, "errors", None)
+    _collector.errors = errors
+    try:
+        yield errors
+    finally:
+        _collector.errors = previous
@@ -0,0 +1,169 @@
+import queue
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from lox import core, hooks
+from lox.errors import LoxError
+from lox.interpreter import Interpreter
+from lox.optimizer import Optimizer
+from lox.output import CaptureOutput
+from lox.parser import StreamParser
+from lox.resolver import Resolver
+from lox.scanner import RegexScanner
+from lox.statements import Stmt
+
+class Program:
+    """Source compiled by a LoxEngine, ready to be executed any number of times.
+
+    Programs are never modified after compiling, so one may be shared by
+    threads. errors holds the syntax errors found; a program with errors
+    does not run.
+    """
+
+    def __init__(self, source: str, stmts: List[Stmt], errors: List[LoxError]):
+        self.source = source
+        self.stmts = stmts
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+class Result:
+    """Outcome of executing a Program.
+
+    output lists the printed lines when no sink was given, globals holds the
+    program's global variables once it stopped, and errors any syntax or
+    runtime errors.
+    """
+
+    def __init__(self, output: List[str], globals: Dict[str, object], errors: List[LoxError]):
+        self.output = output
+        self.globals = globals
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+def lox_value(name: str, value):
+    if value is None or type(value) in (bool, float, str):
+        return value
+    if type(value) == int:
+        return float(value)
+    raise TypeError(f"Cannot pass {type(value).__name__} value {name!r} to Lox")
+
+class LoxEngine:
+    """Entry point for embedding Lox.
+
+    compile() turns source into a Program and execute() runs one on a fresh
+    interpreter, with globals injected up front. Neither touches the
+    module-level error flags or prints errors, so an engine can be used from
+    several threads at once; see InterpreterPool to also reuse interpreters.
+    """
+
+    def __init__(self, engine: str = "tree", optimize: bool = True):
+        if engine not in core.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}")
+        self.engine = engine
+        self.optimize = optimize
+
+    def compile(self, source: str) -> Program:
+        errors = []
+        with core.collect_errors(errors):
+            with hooks.phase("scan"):
+                tokens = RegexScanner(source).scan_buffer()
+            with hooks.phase("parse"):
+                stmts = StreamParser(tokens).parse()
+            if not errors:
+                if self.optimize:
+                    with hooks.phase("optimize"):
+                        stmts = Optimizer().optimize(stmts)
+                with hooks.phase("resolve"):
+                    Resolver().resolve(stmts)
+        return Program(source, stmts, errors)
+
+    def interpreter(self) -> Interpreter:
+        return core.ENGINES[self.engine]()
+
+    def execute(
+        self,
+        program: Program,
+        globals: Dict[str, object] = None,
+        output: Optional[Callable[[str], None]] = None,
+    ) -> Result:
+        return self.execute_on(self.interpreter(), program, globals, output)
+
+    def run(self, source: str, globals: Dict[str, object] = None, output: Optional[Callable[[str], None]] = None) -> Result:
+        return self.execute(self.compile(source), globals, output)
+
+    def execute_on(
+        self,
+        interpreter: Interpreter,
+        program: Program,
+        globals: Dict[str, object] = None,
+        output: Optional[Callable[[str], None]] = None,
+        compiled: Dict[Program, object] = None,
+    ) -> Result:
+        """Runs program on interpreter, which should have no globals yet.
+
+        compiled caches what the interpreter's engine compiled each program
+        into, for interpreters that are reused.
+        """
+        captured = CaptureOutput()
+        if not program.ok:
+            return Result(captured, {}, list(program.errors))
+        values = interpreter.globals.values
+        for name, value in (globals or {}).items():
+            values[name] = lox_value(name, value)
+        interpreter.out = output or captured
+        errors = []
+        with core.collect_errors(errors), hooks.phase("execute"):
+            try:
+                prepared = compiled.get(program) if compiled is not None else None
+                if prepared is None:
+                    prepared = interpreter.prepare(program.stmts)
+                    if compiled is not None and prepared is not None:
+                        compiled[program] = prepared
+                if prepared is not None:
+                    try:
+                        interpreter.run(prepared)
+                    finally:
+                        interpreter.flush()
+            except RecursionError:
+                core.nested_too_deeply(interpreter, program.stmts)
+        return Result(captured, dict(values), errors)
+
+class InterpreterPool:
+    """A fixed set of interpreters shared by threads executing Programs.
+
+    Each execute() checks an interpreter out, waiting if all of them are
+    busy, so no two threads ever share interpreter state. Interpreters are
+    reset between programs and keep what they compiled for a Program, so
+    running the same program again skips the engine's compile step.
+    """
+
+    def __init__(self, engine: LoxEngine, size: int = 4):
+        self.engine = engine
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put((engine.interpreter(), weakref.WeakKeyDictionary()))
+
+    @contextmanager
+    def checkout(self):
+        entry = self.idle.get()
+        try:
+            yield entry
+        finally:
+            entry[0].reset()
+            self.idle.put(entry)
+
+    def execute(
+        self,
+        program: Program,
+        globals: Dict[str, object] = None,
+        output: Optional[Callable[[str], None]] = None,
+    ) -> Result:
+        with self.checkout() as (interpreter, compiled):
+            return self.engine.execute_on(interpreter, program, globals, output, compiled)
@@ -1,24 +1,106 @@
+import sys
+from typing import Dict
+
 from lox.errors import RuntimeError
 
 class Environment:
+    __slots__ = ("values", "enclosing")
+
     def __init__(self, enclosing = None):
         self.values = dict()
-        self.enclosing = None
+        self.enclosing = enclosing
 
     def define(self, key, value) -> None:
         self.values[key] = value
 
     def get(self, key):
-        if key in self.values:
-            return self.values[key]
+        if key.lexeme in self.values:
+            return self.values[key.lexeme]
         if self.enclosing:
-            return self.enclosing,get(key)
+            return self.enclosing.get(key)
         raise RuntimeError(key, f"Undefined variable '{key.lexeme}'.")
 
     def assign(self, key, value) -> None:
-        if key in self.values:
-            self.values[key] = value
+        if key.lexeme in self.values:
+            self.values[key.lexeme] = value
             return
         if self.enclosing:
             self.enclosing.assign(key, value)
-        raise RuntimeError(key, f"Undefined variable '{key.lexeme}'.")
\ No newline at end of file
+            return
+        raise RuntimeError(key, f"Undefined variable '{key.lexeme}'.")
+
+class LocalEnvironment:
+    """Block scope whose variables are addressed by slot, as assigned by the Resolver."""
+
+    __slots__ = ("values", "enclosing")
+
+    def __init__(self, size: int, enclosing = None):
+        self.values = [None] * size
+        self.enclosing = enclosing
+
+    def get_at(self, depth: int, slot: int):
+        env = self
+        for _ in range(depth):
+            env = env.enclosing
+        return env.values[slot]
+
+    def assign_at(self, depth: int, slot: int, value) -> None:
+        env = self
+        for _ in range(depth):
+            env = env.enclosing
+        env.values[slot] = value
+
+class ScopePool:
+    """Free list of LocalEnvironments, reused across block entries.
+
+    Lox has no closures yet, so a scope never outlives its block and can be
+    handed out again as soon as the block exits. Counters track how many
+    scopes were created versus recycled and how deep nesting got.
+    """
+
+    __slots__ = ("free", "blanks", "allocated", "reused", "live", "peak_live", "bytes_allocated")
+
+    def __init__(self):
+        self.free: Dict[int, list] = {}
+        self.blanks: Dict[int, list] = {}
+        self.allocated = 0
+        self.reused = 0
+        self.live = 0
+        self.peak_live = 0
+        self.bytes_allocated = 0
+
+    def acquire(self, size: int, enclosing) -> LocalEnvironment:
+        free = self.free.get(size)
+        if free:
+            env = free.pop()
+            env.enclosing = enclosing
+            self.reused += 1
+        else:
+            env = LocalEnvironment(size, enclosing)
+            self.allocated += 1
+            self.bytes_allocated += sys.getsizeof(env) + sys.getsizeof(env.values)
+        self.live += 1
+        if self.live > self.peak_live:
+            self.peak_live = self.live
+        return env
+
+    def release(self, env: LocalEnvironment) -> None:
+        size = len(env.values)
+        blank = self.blanks.get(size)
+        if blank is None:
+            blank = self.blanks[size] = [None] * size
+        # Drop references to the block's values without allocating a new list
+        env.values[:] = blank
+        env.enclosing = None
+        self.free.setdefault(size, []).append(env)
+        self.live -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "scopes_entered": self.allocated + self.reused,
+            "scopes_allocated": self.allocated,
+            "scopes_reused": self.reused,
+            "peak_live_scopes": self.peak_live,
+            "bytes_allocated": self.bytes_allocated,
+            "pooled_scopes": sum(len(free) for free in self.free.values()),
+        }
@@ -4,3 +4,22 @@ class RuntimeError(Exception):
     def __init__(self, token: Token, message: str):
         self.message = message
         self.token = token
+
+class LoxError:
+    """A syntax or runtime error reported while compiling or running a program."""
+
+    __slots__ = ("kind", "line", "where", "message")
+
+    def __init__(self, kind: str, line: int, message: str, where: str = ""):
+        self.kind = kind
+        self.line = line
+        self.message = message
+        self.where = where
+
+    def __repr__(self):
+        return f"LoxError({self.kind!r}, {self.line!r}, {self.message!r}, {self.where!r})"
+
+    def __str__(self):
+        if self.kind == "runtime":
+            return f"{self.message}\n[line {self.line}]"
+        return f"[line {self.line}] Error {self.where}: {self.message}"
@@ -0,0 +1,138 @@
+# Generated by lox/generate_ast.py; edit the node descriptions there, not this file.
+"""Whole trees kept in flat arrays instead of one object per node."""
+import sys
+from array import array
+from typing import List
+
+from lox.lox_types import BINARY, GROUPING, LITERAL, UNARY, VARIABLE, ASSIGNMENT
+from lox.lox_types import Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.statements import PRINT, EXPRESSION, VAR, BLOCK
+from lox.statements import Stmt, Print, Expression, Var, Block
+from lox.tokens import Token, TokenType
+
+# Storage classes: a child node's index (-1 for None), a count followed by
+# that many node indices, a token's index, and an index into values
+NODE, NODES, TOKEN, VALUE = range(4)
+
+_TOKEN_TYPES = {type.value: type for type in TokenType}
+
+# What a FlatTree keeps of each node kind: (attribute, storage class) pairs
+LAYOUTS = {
+    BINARY: (("left", NODE), ("operator", TOKEN), ("right", NODE)),
+    GROUPING: (("expression", NODE),),
+    LITERAL: (("value", VALUE),),
+    UNARY: (("operator", TOKEN), ("right", NODE)),
+    VARIABLE: (("name", TOKEN), ("depth", VALUE), ("slot", VALUE)),
+    ASSIGNMENT: (("name", TOKEN), ("value", NODE), ("depth", VALUE), ("slot", VALUE)),
+    PRINT: (("expr", NODE),),
+    EXPRESSION: (("expr", NODE),),
+    VAR: (("name", TOKEN), ("initializer", NODE), ("slot", VALUE)),
+    BLOCK: (("stmts", NODES), ("slot_count", VALUE)),
+}
+
+CLASSES = {
+    BINARY: Binary,
+    GROUPING: Grouping,
+    LITERAL: Literal,
+    UNARY: Unary,
+    VARIABLE: Variable,
+    ASSIGNMENT: Assignment,
+    PRINT: Print,
+    EXPRESSION: Expression,
+    VAR: Var,
+    BLOCK: Block,
+}
+
+class FlatTree:
+    """Statements stored as arrays, in post-order, so every child comes
+    before its parent.
+
+    A node is its kind byte and the offset of its attributes in data, laid
+    out as LAYOUTS says. Tokens are kept as type, lexeme and line columns,
+    and other values in a list. Building and rebuilding never recurse, so
+    trees may nest as deeply as memory allows. Caches on the nodes are not
+    kept.
+    """
+
+    def __init__(self, stmts: List[Stmt] = ()):
+        self.kinds = bytearray()
+        self.offsets = array("I")
+        self.data = array("i")
+        self.values = []
+        self.token_types = bytearray()
+        self.token_lexemes = []
+        self.token_lines = array("I")
+        self.roots = array("I")
+        for stmt in stmts:
+            self.roots.append(self.add(stmt))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def add(self, root) -> int:
+        """Stores root and everything under it; returns root's index."""
+        indices = {}
+        work = [(root, False)]
+        while work:
+            node, children_done = work.pop()
+            layout = LAYOUTS[node.kind]
+            if not children_done:
+                work.append((node, True))
+                for name, storage in reversed(layout):
+                    value = getattr(node, name)
+                    if storage == NODE and value is not None:
+                        work.append((value, False))
+                    elif storage == NODES:
+                        work.extend((child, False) for child in reversed(value))
+                continue
+            data = self.data
+            indices[id(node)] = len(self.kinds)
+            self.kinds.append(node.kind)
+            self.offsets.append(len(data))
+            for name, storage in layout:
+                value = getattr(node, name)
+                if storage == NODE:
+                    data.append(-1 if value is None else indices[id(value)])
+                elif storage == NODES:
+                    data.append(len(value))
+                    data.extend(indices[id(child)] for child in value)
+                elif storage == TOKEN:
+                    data.append(len(self.token_types))
+                    self.token_types.append(value.type.value)
+                    self.token_lexemes.append(value.lexeme)
+                    self.token_lines.append(value.line)
+                else:
+                    data.append(len(self.values))
+                    self.values.append(value)
+        return indices[id(root)]
+
+    def token(self, index: int) -> Token:
+        return Token(_TOKEN_TYPES[self.token_types[index]], sys.intern(self.token_lexemes[index]), None, self.token_lines[index])
+
+    def to_stmts(self) -> List[Stmt]:
+        """Rebuilds the statements as node objects."""
+        nodes = []
+        data = self.data
+        values = self.values
+        for index, kind in enumerate(self.kinds):
+            cls = CLASSES[kind]
+            position = self.offsets[index]
+            attributes = []
+            for _, storage in LAYOUTS[kind]:
+                item = data[position]
+                position += 1
+                if storage == NODE:
+                    attributes.append(None if item < 0 else nodes[item])
+                elif storage == NODES:
+                    attributes.append([nodes[child] for child in data[position:position + item]])
+                    position += item
+                elif storage == TOKEN:
+                    attributes.append(self.token(item))
+                else:
+                    attributes.append(values[item])
+            count = len(cls.fields)
+            node = cls(*attributes[:count])
+            for (name, _), value in zip(LAYOUTS[kind][count:], attributes[count:]):
+                setattr(node, name, value)
+            nodes.append(node)
+        return [nodes[root] for root in self.roots]
@@ -0,0 +1,25 @@
+"""Text of Lox values, as print statements show them."""
+from functools import lru_cache
+
+# Integral floats from -SMALL_INTEGERS to SMALL_INTEGERS have their text
+# precomputed, since loop counters and the like are most of what gets printed
+SMALL_INTEGERS = 1024
+
+_small_floats = {float(i): str(i) for i in range(-SMALL_INTEGERS, SMALL_INTEGERS + 1)}
+
+@lru_cache(maxsize=4096)
+def _float_text(val: float) -> str:
+    if val.is_integer():
+        return str(int(val))
+    return str(val)
+
+def stringify(val) -> str:
+    # Check the type first: True == 1.0, so a bool would hit the float caches
+    if type(val) == float:
+        text = _small_floats.get(val)
+        if text is None:
+            text = _float_text(val)
+        return text
+    if val is None:
+        return "nil"
+    return str(val)
@@ -1,69 +1,265 @@
+"""Generates the AST node modules: lox_types.py, statements.py and flat_ast.py.
+
+    python3 -m lox.generate_ast [directory]
+
+Each node is described as
+
+    Name : Type field, ... | attribute = default, cache, ...
+
+Fields are the constructor's arguments. Attributes after '|' are filled in
+by later passes; those with a default are set by the constructor and kept by
+flat_ast.FlatTree, and bare ones are caches that stay unset until used.
+"""
+import os
 import sys
-from typing import List
+from typing import List, Tuple
 
+EXPRESSIONS = [
+    "Binary     : Expr left, Token operator, Expr right",
+    "Grouping   : Expr expression",
+    "Literal    : Any value",
+    "Unary      : Token operator, Expr right",
+    # depth and slot are resolved by the Resolver; None is a global
+    "Variable   : Token name | depth = None, slot = None",
+    "Assignment : Token name, Expr value | depth = None, slot = None",
+]
 
-def main():
-    if len(sys.argv) != 1:
-        print("Usage: python3 generate_ast.py")
-        sys.exit(64)
-    types = [
-        "Binary   : Expr left, Token operator, Expr right",
-        "Grouping : Expr expression",
-        "Literal  : Any value",
-        "Unary    : Token operator, Expr right",
-    ]
+STATEMENTS = [
+    "Print      : Expr expr",
+    "Expression : Expr expr",
+    "Var        : Token name, Optional[Expr] initializer = None | slot = None",
+    "Block      : List[Stmt] stmts | slot_count = 0",
+]
 
-    define_ast("Expr", types)
+HEADER = "# Generated by lox/generate_ast.py; edit the node descriptions there, not this file."
 
+class Node:
+    def __init__(self, description: str, kind: int):
+        name, rest = [part.strip() for part in description.split(":", 1)]
+        fields, _, attributes = rest.partition("|")
+        self.name = name
+        self.kind = kind
+        # (type, name, default or None)
+        self.fields: List[Tuple[str, str, str]] = []
+        for field in fields.split(","):
+            declaration, _, default = field.partition("=")
+            type, name = declaration.split()
+            self.fields.append((type, name, default.strip() or None))
+        # (name, default or None)
+        self.attributes: List[Tuple[str, str]] = []
+        for attribute in filter(None, (part.strip() for part in attributes.split(","))):
+            name, _, default = attribute.partition("=")
+            self.attributes.append((name.strip(), default.strip() or None))
 
-def define_ast(base_class: str, types: List[str]):
-    print(f"""from abc import ABC, abstractmethod
-from typing import Any
+    @property
+    def tag(self) -> str:
+        return self.name.upper()
 
-from tokens import Token, TokenType
+    def slots(self) -> List[str]:
+        return [name for _, name, _ in self.fields] + [name for name, _ in self.attributes]
 
-class {base_class}(ABC):
-    @abstractmethod
-    def accept(self, visitor) -> Any:
-        pass""") 
+    def layout(self) -> List[Tuple[str, str]]:
+        """Names and storage classes of what FlatTree keeps for the node."""
+        storage = {"Expr": "NODE", "Stmt": "NODE", "Optional[Expr]": "NODE", "List[Stmt]": "NODES", "Token": "TOKEN"}
+        layout = [(name, storage.get(type, "VALUE")) for type, name, _ in self.fields]
+        return layout + [(name, "VALUE") for name, default in self.attributes if default is not None]
 
-    for type in types:
-       define_type(type, base_class)
+def names(items: List[str]) -> str:
+    """A tuple literal of the strings in items."""
+    if len(items) == 1:
+        return f'("{items[0]}",)'
+    return "(" + ", ".join(f'"{item}"' for item in items) + ")"
 
-    define_visitor(base_class, types)
+def define_ast(base_class: str, nodes: List[Node], imports: List[str], base_slots: List[Tuple[str, str]]) -> List[str]:
+    lines = [HEADER] + imports + [""]
+    first = f"{nodes[0].kind}, " if nodes[0].kind else ""
+    lines.append(f"{', '.join(node.tag for node in nodes)} = range({first}{nodes[-1].kind + 1})")
+    lines.append("")
+    lines.append(f"class {base_class}:")
+    for name, comment in base_slots:
+        lines.append(f"    # {comment}")
+    lines.append(f"    __slots__ = {names([name for name, _ in base_slots])}")
+    lines.append("    # Integer tag of the node type, shared by its subclasses")
+    lines.append("    kind: int")
+    lines.append("    # Constructor arguments, in order")
+    lines.append("    fields: Tuple[str, ...] = ()")
+    for node in nodes:
+        lines.append("")
+        lines.extend(define_type(base_class, node))
+    return lines
 
-def define_visitor(base_class: str, types: List[str]):
-    print()
-    print("class Visitor(ABC):")
-    for type in types:
-        cls = type.split(":")[0].strip()
-        print(f"   @abstractmethod")
-        print(f"   def visit_{cls.lower()}_{base_class.lower()}(self, expr: {cls}):")
-        print(f"        pass")
-        print()
+def define_type(base_class: str, node: Node) -> List[str]:
+    lines = [f"class {node.name}({base_class}):"]
+    lines.append(f"    __slots__ = {names(node.slots())}")
+    lines.append(f"    kind = {node.tag}")
+    lines.append(f"    fields = {names([name for _, name, _ in node.fields])}")
+    lines.append("")
+    parameters = "".join(
+        f", {name}: {type}" + (f" = {default}" if default is not None else "")
+        for type, name, default in node.fields
+    )
+    lines.append(f"    def __init__(self{parameters}):")
+    for _, name, _ in node.fields:
+        lines.append(f"        self.{name} = {name}")
+    for name, default in node.attributes:
+        if default is not None:
+            lines.append(f"        self.{name} = {default}")
+    return lines
 
+def define_flat(nodes: List[Node]) -> List[str]:
+    lines = [HEADER, FLAT_IMPORTS]
+    lines.append("# What a FlatTree keeps of each node kind: (attribute, storage class) pairs")
+    lines.append("LAYOUTS = {")
+    for node in nodes:
+        layout = [f'("{name}", {storage})' for name, storage in node.layout()]
+        lines.append(f"    {node.tag}: ({', '.join(layout)}{',' if len(layout) == 1 else ''}),")
+    lines.append("}")
+    lines.append("")
+    lines.append("CLASSES = {")
+    for node in nodes:
+        lines.append(f"    {node.tag}: {node.name},")
+    lines.append("}")
+    lines.append(FLAT_TREE)
+    return lines
 
+FLAT_IMPORTS = '''"""Whole trees kept in flat arrays instead of one object per node."""
+import sys
+from array import array
+from typing import List
 
-def define_type(type: str, base_class: str):
-    cls, attrs = [item.strip() for item in type.split(":")]
-    print()
-    print(f"class {cls}({base_class}):")
-    vars = [tuple(attr.strip().split(" ")) for attr in attrs.split(",")]
+from lox.lox_types import BINARY, GROUPING, LITERAL, UNARY, VARIABLE, ASSIGNMENT
+from lox.lox_types import Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.statements import PRINT, EXPRESSION, VAR, BLOCK
+from lox.statements import Stmt, Print, Expression, Var, Block
+from lox.tokens import Token, TokenType
 
-    s = "   def __init__(self"
-    for (_type, val) in vars:
-        s += f", {val}: {_type}"
-    s += "):"
-    print(s)
-    for _type, val in vars:
-        print(f"      self.{val} = {val}")
-    print()
-    print(f"""   def accept(self, visitor):
-        return visitor.visit_{cls.lower()}_expr(self)
-""")
+# Storage classes: a child node's index (-1 for None), a count followed by
+# that many node indices, a token's index, and an index into values
+NODE, NODES, TOKEN, VALUE = range(4)
 
+_TOKEN_TYPES = {type.value: type for type in TokenType}
+'''
 
+FLAT_TREE = '''
+class FlatTree:
+    """Statements stored as arrays, in post-order, so every child comes
+    before its parent.
 
+    A node is its kind byte and the offset of its attributes in data, laid
+    out as LAYOUTS says. Tokens are kept as type, lexeme and line columns,
+    and other values in a list. Building and rebuilding never recurse, so
+    trees may nest as deeply as memory allows. Caches on the nodes are not
+    kept.
+    """
+
+    def __init__(self, stmts: List[Stmt] = ()):
+        self.kinds = bytearray()
+        self.offsets = array("I")
+        self.data = array("i")
+        self.values = []
+        self.token_types = bytearray()
+        self.token_lexemes = []
+        self.token_lines = array("I")
+        self.roots = array("I")
+        for stmt in stmts:
+            self.roots.append(self.add(stmt))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def add(self, root) -> int:
+        """Stores root and everything under it; returns root's index."""
+        indices = {}
+        work = [(root, False)]
+        while work:
+            node, children_done = work.pop()
+            layout = LAYOUTS[node.kind]
+            if not children_done:
+                work.append((node, True))
+                for name, storage in reversed(layout):
+                    value = getattr(node, name)
+                    if storage == NODE and value is not None:
+                        work.append((value, False))
+                    elif storage == NODES:
+                        work.extend((child, False) for child in reversed(value))
+                continue
+            data = self.data
+            indices[id(node)] = len(self.kinds)
+            self.kinds.append(node.kind)
+            self.offsets.append(len(data))
+            for name, storage in layout:
+                value = getattr(node, name)
+                if storage == NODE:
+                    data.append(-1 if value is None else indices[id(value)])
+                elif storage == NODES:
+                    data.append(len(value))
+                    data.extend(indices[id(child)] for child in value)
+                elif storage == TOKEN:
+                    data.append(len(self.token_types))
+                    self.token_types.append(value.type.value)
+                    self.token_lexemes.append(value.lexeme)
+                    self.token_lines.append(value.line)
+                else:
+                    data.append(len(self.values))
+                    self.values.append(value)
+        return indices[id(root)]
+
+    def token(self, index: int) -> Token:
+        return Token(_TOKEN_TYPES[self.token_types[index]], sys.intern(self.token_lexemes[index]), None, self.token_lines[index])
+
+    def to_stmts(self) -> List[Stmt]:
+        """Rebuilds the statements as node objects."""
+        nodes = []
+        data = self.data
+        values = self.values
+        for index, kind in enumerate(self.kinds):
+            cls = CLASSES[kind]
+            position = self.offsets[index]
+            attributes = []
+            for _, storage in LAYOUTS[kind]:
+                item = data[position]
+                position += 1
+                if storage == NODE:
+                    attributes.append(None if item < 0 else nodes[item])
+                elif storage == NODES:
+                    attributes.append([nodes[child] for child in data[position:position + item]])
+                    position += item
+                elif storage == TOKEN:
+                    attributes.append(self.token(item))
+                else:
+                    attributes.append(values[item])
+            count = len(cls.fields)
+            node = cls(*attributes[:count])
+            for (name, _), value in zip(LAYOUTS[kind][count:], attributes[count:]):
+                setattr(node, name, value)
+            nodes.append(node)
+        return [nodes[root] for root in self.roots]'''
+
+def main():
+    if len(sys.argv) > 2:
+        print("Usage: python3 -m lox.generate_ast [directory]")
+        sys.exit(64)
+    directory = sys.argv[1] if len(sys.argv) == 2 else os.path.dirname(os.path.abspath(__file__))
+    expressions = [Node(description, kind) for kind, description in enumerate(EXPRESSIONS)]
+    statements = [Node(description, kind) for kind, description in enumerate(STATEMENTS, len(expressions))]
+    modules = {
+        "lox_types.py": define_ast(
+            "Expr",
+            expressions,
+            ["from typing import Any, Tuple", "", "from lox.tokens import Token"],
+            [],
+        ),
+        "statements.py": define_ast(
+            "Stmt",
+            statements,
+            ["from typing import List, Optional, Tuple", "", "from lox.lox_types import Expr", "from lox.tokens import Token"],
+            [],
+        ),
+        "flat_ast.py": define_flat(expressions + statements),
+    }
+    for name, lines in modules.items():
+        with open(os.path.join(directory, name), "w") as f:
+            f.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,142 @@
+"""Callbacks fired as Lox code is scanned, parsed and executed.
+
+    from lox import hooks
+    hooks.subscribe("phase_end", lambda phase, seconds: ...)
+
+Events and the arguments their callbacks receive:
+
+    phase_start(phase)            phase is scan, parse, optimize, resolve or execute
+    phase_end(phase, seconds)
+    statement(stmt, seconds)      after each statement the tree-walker runs
+    environment(env)              when the tree or closure engine enters a block
+    runtime_error(error)          lox.errors.RuntimeError, before it is reported
+
+The python and vm engines keep block locals in Python locals and stack slots,
+so they fire no environment events. Statement and environment events are
+checked for on hot paths, so they only cost a list lookup while nobody
+subscribes to them.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+EVENTS = ("phase_start", "phase_end", "statement", "environment", "runtime_error")
+
+listeners: Dict[str, List[Callable]] = {event: [] for event in EVENTS}
+
+def subscribe(event: str, callback: Callable) -> None:
+    if event not in listeners:
+        raise ValueError(f"Unknown event {event!r}")
+    # Copy on write, so emit() never sees a list change under it
+    listeners[event] = listeners[event] + [callback]
+
+def unsubscribe(event: str, callback: Callable) -> None:
+    listeners[event] = [listener for listener in listeners[event] if listener is not callback]
+
+def emit(event: str, *args) -> None:
+    for callback in listeners[event]:
+        callback(*args)
+
+@contextmanager
+def phase(name: str):
+    emit("phase_start", name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit("phase_end", name, time.perf_counter() - start)
+
+class Latency:
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+
+class MetricsCollector:
+    """Aggregates every event into counts and latencies.
+
+    Use it as a context manager, or call install() and uninstall(); snapshot()
+    returns plain dicts ready for export.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.phases: Dict[str, Latency] = {}
+        self.statements: Dict[str, Latency] = {}
+        self.runtime_errors: Dict[str, int] = {}
+        self.environments = 0
+
+    def install(self) -> "MetricsCollector":
+        subscribe("phase_end", self.on_phase_end)
+        subscribe("statement", self.on_statement)
+        subscribe("environment", self.on_environment)
+        subscribe("runtime_error", self.on_runtime_error)
+        return self
+
+    def uninstall(self) -> None:
+        unsubscribe("phase_end", self.on_phase_end)
+        unsubscribe("statement", self.on_statement)
+        unsubscribe("environment", self.on_environment)
+        unsubscribe("runtime_error", self.on_runtime_error)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def on_phase_end(self, phase: str, seconds: float) -> None:
+        with self.lock:
+            latency = self.phases.get(phase)
+            if latency is None:
+                latency = self.phases[phase] = Latency()
+            latency.add(seconds)
+
+    def on_statement(self, stmt, seconds: float) -> None:
+        name = type(stmt).__name__
+        with self.lock:
+            latency = self.statements.get(name)
+            if latency is None:
+                latency = self.statements[name] = Latency()
+            latency.add(seconds)
+
+    def on_environment(self, env) -> None:
+        with self.lock:
+            self.environments += 1
+
+    def on_runtime_error(self, error) -> None:
+        with self.lock:
+            self.runtime_errors[error.message] = self.runtime_errors.get(error.message, 0) + 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self.lock:
+            return {
+                "phases": {name: latency.as_dict() for name, latency in self.phases.items()},
+                "statements": {name: latency.as_dict() for name, latency in self.statements.items()},
+                "environments": self.environments,
+                "runtime_errors": dict(self.runtime_errors),
+            }
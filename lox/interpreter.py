@@ -1,83 +1,209 @@
+import operator
+import time
 from typing import List
 
-from lox import core
+from lox import core, hooks
 from lox.lox_types import Expr, Binary, Grouping, Literal, Unary, Variable, Assignment
 from lox.tokens import TokenType, Token
 from lox.typedispatch import visitor, _methods
 from lox.statements import Print, Expression, Var, Stmt, Block
-from lox.environment import Environment
+from lox.environment import Environment, ScopePool
 from lox.errors import RuntimeError
+from lox.formatting import stringify
+
+# Operations a Binary node with two float operands can specialize to. The
+# operator module's functions are called only once both operands are known
+# to be floats, and are cheaper to call than float's slot wrappers.
+FLOAT_OPERATIONS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.PLUS: operator.add,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+# Binary nodes that are not specialized: evaluated once so far, and seen to
+# miss after specializing, after which they stay generic
+WARM = "warm"
+GENERIC = "generic"
+
+class PreparedTree:
+    """Statements ready for a tree-walker, with what it learns about their
+    nodes from run to run.
+
+    binaries maps a Binary node to WARM, GENERIC or, once specialized, its
+    operand type and fast operation. The nodes themselves are never
+    modified, so the statements may be shared with other interpreters.
+    """
+
+    def __init__(self, stmts: List[Stmt]):
+        self.stmts = stmts
+        self.binaries = {}
 
 class Interpreter:
-    def __init__(self):
-        self.environment = Environment()
+    def __init__(self, out=print):
+        self.globals = Environment()
+        self.environment = self.globals
+        self.scopes = ScopePool()
+        # Called with the text of every print statement
+        self.out = out
+        # PreparedTree.binaries of the statements being run
+        self.binaries = {}
 
     def interpret(self, stmts: List[Stmt]):
         try:
-            for stmt in stmts:
-                val = self.visit(stmt)
+            program = self.prepare(stmts)
+            if program is not None:
+                self.run(program)
+        finally:
+            self.flush()
+
+    def prepare(self, stmts: List[Stmt]):
+        """Translates resolved statements into what run() executes, or None on error.
+
+        The result does not depend on the globals, so it can be run again.
+        """
+        return PreparedTree(stmts)
+
+    def run(self, prepared: PreparedTree):
+        self.binaries = prepared.binaries
+        try:
+            self.execute_all(prepared.stmts)
         except RuntimeError as error:
-            core.runtime_error(error)
+            self.runtime_error(error)
 
-    def stringify(self, val) -> str:
-        if val is None:
-            return "nil"
+    def execute_all(self, stmts: List[Stmt]):
+        if not hooks.listeners["statement"]:
+            for stmt in stmts:
+                self.visit(stmt)
+            return
+        for stmt in stmts:
+            start = time.perf_counter()
+            self.visit(stmt)
+            hooks.emit("statement", stmt, time.perf_counter() - start)
+
+    def flush(self) -> None:
+        flush = getattr(self.out, "flush", None)
+        if flush is not None:
+            flush()
+
+    def runtime_error(self, error: RuntimeError) -> None:
+        # Lines printed before the error must come out ahead of its report
+        self.flush()
+        core.runtime_error(error)
 
-        if type(val) == float and val.is_integer():
-            return str(int(val))
-        return str(val)
+    def reset(self) -> None:
+        """Forgets every global so another program can run from a clean slate."""
+        self.globals.values.clear()
+        self.environment = self.globals
+
+    stringify = staticmethod(stringify)
+
+    def evaluate(self, expr: Expr):
+        return self.visit(expr)
 
     @visitor(Block)
     def visit(self, block: Block):
-        self.execute_block(block.stmts, Environment(self.environment))
+        environment = self.scopes.acquire(block.slot_count, self.environment)
+        if hooks.listeners["environment"]:
+            hooks.emit("environment", environment)
+        try:
+            self.execute_block(block.stmts, environment)
+        finally:
+            self.scopes.release(environment)
 
     def execute_block(self, stmts, environment):
-        prev = environment
+        prev = self.environment
         try:
-            for stmt in stmts:
-                self.visit(stmt)
-        except:
-            pass
+            self.environment = environment
+            self.execute_all(stmts)
         finally:
             self.environment = prev
 
 
     @visitor(Print)
     def visit(self, expr: Print):
-        val = self.visit(expr.expr)
-        print(self.stringify(val))
+        val = self.evaluate(expr.expr)
+        self.out(self.stringify(val))
 
     @visitor(Expression)
     def visit(self, expr: Expression):
-        self.visit(expr.expr)
+        self.evaluate(expr.expr)
 
     @visitor(Var)
     def visit(self, var: Var) -> None:
         value = None
         if var.initializer is not None:
-            value = self.visit(var.initializer)
-        self.environment.define(var.name.lexeme, value)
+            value = self.evaluate(var.initializer)
+        if var.slot is None:
+            self.globals.define(var.name.lexeme, value)
+        else:
+            self.environment.values[var.slot] = value
 
     @visitor(Variable)
     def visit(self, var: Variable):
-        return self.environment.get(var.name)
+        if var.depth is None:
+            return self.globals.get(var.name)
+        return self.environment.get_at(var.depth, var.slot)
 
     @visitor(Assignment)
     def visit(self, expr):
         val = self.visit(expr.value)
-        self.environment.assign(expr.name, val)
+        if expr.depth is None:
+            self.globals.assign(expr.name, val)
+        else:
+            self.environment.assign_at(expr.depth, expr.slot, val)
         return val
         
     @visitor(Binary)
     def visit(self, expr: Binary):
         left = self.visit(expr.left)
         right = self.visit(expr.right)
+        state = self.binaries.get(expr)
+        if state is None:
+            # Code that only runs once isn't worth specializing
+            self.binaries[expr] = WARM
+        elif state is WARM:
+            self.specialize(expr, left, right)
+        elif state is not GENERIC:
+            operand, fast = state
+            if type(left) is operand and type(right) is operand:
+                try:
+                    return fast(left, right)
+                except ZeroDivisionError:
+                    raise RuntimeError(expr.operator, "Right operand must be non-zero")
+            self.binaries[expr] = GENERIC
+        return self.binary(expr, left, right)
+
+    def specialize(self, expr: Binary, left, right) -> None:
+        """Records a fast path for expr with these operands.
+
+        Called from a node's second evaluation on. Nodes stay specialized
+        across runs of the same PreparedTree; a later type miss makes them
+        GENERIC for good.
+        """
+        if type(left) is float and type(right) is float:
+            fast = FLOAT_OPERATIONS.get(expr.operator.type)
+            if fast is not None:
+                self.binaries[expr] = (float, fast)
+        elif type(left) is str and type(right) is str and expr.operator.type == TokenType.PLUS:
+            self.binaries[expr] = (str, operator.add)
+
+    def binary(self, expr: Binary, left, right):
         if expr.operator.type == TokenType.MINUS:
             self.check_number_operands(expr.operator, left, right)
             return left - right
         elif expr.operator.type == TokenType.PLUS:
-            self.check_number_operands(expr.operator, left, right)
-            return left + right
+            if type(right) == type(left) == str:
+                return left + right
+            elif type(right) == type(left) == float:
+                return left + right
+            elif (type(right) == str and type(left) == float) or (type(left) == str and type(right) == float):
+                return str(left) + str(right)
+            raise RuntimeError(expr.operator, "Operands must be two numbers or two strings.")
         elif expr.operator.type == TokenType.STAR:
             self.check_number_operands(expr.operator, left, right)
             return left * right
@@ -86,15 +212,6 @@ class Interpreter:
             if right == 0:
                 raise RuntimeError(expr.operator, "Right operand must be non-zero")
             return left / right
-        elif expr.operator.type == TokenType.PLUS:
-            # TODO: Redundant?
-            if type(right) == type(left) == str:
-                return left + right
-            elif type(right) == type(left) == type(float):
-                return left + right
-            elif (type(right) == str and type(left) == float) or (type(left) == float and type(right) == str):
-                return str(left) + str(right)
-            raise RuntimeError(expr.operator, "Operands must be two numbers or two strings.")
         elif expr.operator.type == TokenType.GREATER:
             self.check_number_operands(expr.operator, left, right)
             return left > right
@@ -115,7 +232,9 @@ class Interpreter:
 
     @visitor(Unary)
     def visit(self, expr: Unary):
-        right = self.visit(expr.right)
+        return self.unary(expr, self.visit(expr.right))
+
+    def unary(self, expr: Unary, right):
         if expr.operator.type == TokenType.MINUS:
             self.check_number_operand(expr.operator, right)
             return -1*right
@@ -124,13 +243,13 @@ class Interpreter:
 
     @visitor(Grouping)
     def visit(self, expr: Grouping):
-        return self.visit(expr)
+        return self.visit(expr.expression)
 
     @visitor(Literal)
     def visit(self, expr: Literal):
         return expr.value
 
-    def is_tuthy(self, expr) -> bool:
+    def is_truthy(self, expr) -> bool:
         if expr == None: return False
         if type(expr) == bool: return expr
         return True
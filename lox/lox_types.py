@@ -1,76 +1,69 @@
-from abc import ABC, abstractmethod
-from typing import Any
+# Generated by lox/generate_ast.py; edit the node descriptions there, not this file.
+from typing import Any, Tuple
 
-from lox.tokens import Token, TokenType
+from lox.tokens import Token
 
-class Expr(ABC):
-    @abstractmethod
-    def accept(self, visitor) -> Any:
-        pass
+BINARY, GROUPING, LITERAL, UNARY, VARIABLE, ASSIGNMENT = range(6)
 
-class Binary(Expr):
-   def __init__(self, left: Expr, operator: Token, right: Expr):
-      self.left = left
-      self.operator = operator
-      self.right = right
+class Expr:
+    __slots__ = ()
+    # Integer tag of the node type, shared by its subclasses
+    kind: int
+    # Constructor arguments, in order
+    fields: Tuple[str, ...] = ()
 
-   def accept(self, visitor):
-        return visitor.visit_binary_expr(self)
+class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = BINARY
+    fields = ("left", "operator", "right")
 
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
 
 class Grouping(Expr):
-   def __init__(self, expression: Expr):
-      self.expression = expression
-
-   def accept(self, visitor):
-        return visitor.visit_grouping_expr(self)
+    __slots__ = ("expression",)
+    kind = GROUPING
+    fields = ("expression",)
 
+    def __init__(self, expression: Expr):
+        self.expression = expression
 
 class Literal(Expr):
-   def __init__(self, value: Any):
-      self.value = value
-
-   def accept(self, visitor):
-        return visitor.visit_literal_expr(self)
+    __slots__ = ("value",)
+    kind = LITERAL
+    fields = ("value",)
 
+    def __init__(self, value: Any):
+        self.value = value
 
 class Unary(Expr):
-   def __init__(self, operator: Token, right: Expr):
-      self.operator = operator
-      self.right = right
+    __slots__ = ("operator", "right")
+    kind = UNARY
+    fields = ("operator", "right")
 
-   def accept(self, visitor):
-        return visitor.visit_unary_expr(self)
+    def __init__(self, operator: Token, right: Expr):
+        self.operator = operator
+        self.right = right
 
 class Variable(Expr):
-   def __init__(self, name: Token):
-      self.name = name
+    __slots__ = ("name", "depth", "slot")
+    kind = VARIABLE
+    fields = ("name",)
 
-   def accept(self, visitor):
-      pass
+    def __init__(self, name: Token):
+        self.name = name
+        self.depth = None
+        self.slot = None
 
 class Assignment(Expr):
-   def __init__(self, name: Token, value: Expr):
-      self.name = name
-      self.value = value
-
-   def accept(self, visitor):
-      pass
-
-class Visitor(ABC):
-   @abstractmethod
-   def visit_binary_expr(self, expr: Binary):
-        pass
-
-   @abstractmethod
-   def visit_grouping_expr(self, expr: Grouping):
-        pass
-
-   @abstractmethod
-   def visit_literal_expr(self, expr: Literal):
-        pass
-
-   @abstractmethod
-   def visit_unary_expr(self, expr: Unary):
-        pass
-
+    __slots__ = ("name", "value", "depth", "slot")
+    kind = ASSIGNMENT
+    fields = ("name", "value")
+
+    def __init__(self, name: Token, value: Expr):
+        self.name = name
+        self.value = value
+        self.depth = None
+        self.slot = None
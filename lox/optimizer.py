@@ -0,0 +1,141 @@
+from typing import List, Optional
+
+from lox.lox_types import Expr, Binary, Grouping, Literal, Unary, Assignment
+from lox.tokens import TokenType
+from lox.typedispatch import visitor
+from lox.statements import Print, Expression, Var, Stmt, Block
+from lox.errors import RuntimeError
+from lox.interpreter import Interpreter
+
+# Operators whose result is always a number when they don't raise
+NUMERIC_OPERATORS = {TokenType.MINUS, TokenType.STAR, TokenType.SLASH}
+
+class Optimizer:
+    """Folds constant expressions ahead of execution.
+
+    Groupings are dropped, and Unary and Binary nodes whose operands are
+    Literals are replaced by their value, computed by the interpreter itself
+    so results match exactly. A node whose evaluation raises, such as a
+    division by zero, is kept so the error still happens at runtime on the
+    operator's line. Multiplying or dividing by 1 and subtracting 0 are
+    removed where the other operand is known to be a number, and expression
+    statements left as a bare literal are dropped.
+    """
+
+    def __init__(self):
+        self.evaluator = Interpreter()
+
+    def optimize(self, stmts: List[Stmt]) -> List[Stmt]:
+        optimized = []
+        for stmt in stmts:
+            stmt = self.visit(stmt)
+            if stmt is not None:
+                optimized.append(stmt)
+        return optimized
+
+    def fold(self, expr: Expr) -> Expr:
+        try:
+            return Literal(self.evaluator.visit(expr))
+        except RuntimeError:
+            return expr
+
+    def is_number(self, expr: Expr) -> bool:
+        work = [expr]
+        while work:
+            expr = work.pop()
+            if type(expr) == Literal:
+                if type(expr.value) != float:
+                    return False
+            elif type(expr) == Unary:
+                if expr.operator.type != TokenType.MINUS:
+                    return False
+            elif type(expr) == Binary:
+                if expr.operator.type == TokenType.PLUS:
+                    work.append(expr.left)
+                    work.append(expr.right)
+                elif expr.operator.type not in NUMERIC_OPERATORS:
+                    return False
+            else:
+                return False
+        return True
+
+    def simplify(self, expr: Binary) -> Expr:
+        def is_literal(operand, value):
+            return type(operand) == Literal and type(operand.value) == float and operand.value == value
+
+        op = expr.operator.type
+        if op == TokenType.STAR:
+            if is_literal(expr.right, 1) and self.is_number(expr.left):
+                return expr.left
+            if is_literal(expr.left, 1) and self.is_number(expr.right):
+                return expr.right
+        elif op == TokenType.SLASH:
+            if is_literal(expr.right, 1) and self.is_number(expr.left):
+                return expr.left
+        elif op == TokenType.MINUS:
+            if is_literal(expr.right, 0) and self.is_number(expr.left):
+                return expr.left
+        return expr
+
+    @visitor(Block)
+    def visit(self, block: Block) -> Block:
+        block.stmts = self.optimize(block.stmts)
+        return block
+
+    @visitor(Print)
+    def visit(self, stmt: Print) -> Print:
+        stmt.expr = self.visit(stmt.expr)
+        return stmt
+
+    @visitor(Expression)
+    def visit(self, stmt: Expression) -> Optional[Expression]:
+        stmt.expr = self.visit(stmt.expr)
+        if type(stmt.expr) == Literal:
+            return None
+        return stmt
+
+    @visitor(Var)
+    def visit(self, stmt: Var) -> Var:
+        if stmt.initializer is not None:
+            stmt.initializer = self.visit(stmt.initializer)
+        return stmt
+
+    @visitor(Expr)
+    def visit(self, expr: Expr) -> Expr:
+        # Children are optimized before their parent, using explicit stacks so
+        # deeply nested expressions don't recurse
+        results = []
+        work = [(expr, False)]
+        while work:
+            expr, children_done = work.pop()
+            if type(expr) == Grouping:
+                work.append((expr.expression, False))
+            elif type(expr) == Binary:
+                if not children_done:
+                    work.append((expr, True))
+                    work.append((expr.right, False))
+                    work.append((expr.left, False))
+                    continue
+                expr.right = results.pop()
+                expr.left = results.pop()
+                if type(expr.left) == Literal and type(expr.right) == Literal:
+                    results.append(self.fold(expr))
+                else:
+                    results.append(self.simplify(expr))
+            elif type(expr) == Unary:
+                if not children_done:
+                    work.append((expr, True))
+                    work.append((expr.right, False))
+                    continue
+                expr.right = results.pop()
+                results.append(self.fold(expr) if type(expr.right) == Literal else expr)
+            elif type(expr) == Assignment:
+                if not children_done:
+                    work.append((expr, True))
+                    work.append((expr.value, False))
+                    continue
+                expr.value = results.pop()
+                results.append(expr)
+            else:
+                results.append(expr)
+        return results.pop()
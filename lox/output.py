@@ -0,0 +1,87 @@
+"""Sinks for the text of Lox print statements.
+
+An interpreter calls its sink once per print with the text, newline not
+included, and calls its flush() method, if it has one, whenever it stops
+running: at the end of a program and before a runtime error is reported.
+"""
+import os
+import sys
+import time
+from typing import Callable, List
+
+class FdWriter:
+    """Writes text straight to a file descriptor, bypassing sys.stdout."""
+
+    def __init__(self, fd: int = 1, encoding: str = "utf-8"):
+        self.fd = fd
+        self.encoding = encoding
+
+    def write(self, text: str) -> None:
+        # Keep anything print() left in sys.stdout ahead of this text
+        stdout = sys.stdout
+        if stdout is not None and not stdout.closed:
+            try:
+                same_fd = stdout.fileno() == self.fd
+            except (AttributeError, OSError, ValueError):
+                same_fd = False
+            if same_fd:
+                stdout.flush()
+        data = text.encode(self.encoding)
+        while data:
+            written = os.write(self.fd, data)
+            data = data[written:]
+
+class BufferedOutput:
+    """Collects printed lines and writes them out in batches.
+
+    The buffer is written once it holds max_bytes characters or when a print
+    finds max_delay seconds have passed since it was last written, and on
+    flush(). write receives each batch; by default it goes to sys.stdout,
+    or use FdWriter(fd).write to skip Python's text layer.
+    """
+
+    def __init__(self, write: Callable[[str], None] = None, max_bytes: int = 1 << 16, max_delay: float = 0.5):
+        self.write = write
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.lines: List[str] = []
+        self.size = 0
+        self.flushed_at = time.monotonic()
+
+    def __call__(self, text: str) -> None:
+        self.lines.append(text)
+        self.size += len(text) + 1
+        if self.size >= self.max_bytes or time.monotonic() - self.flushed_at >= self.max_delay:
+            self.flush()
+
+    def flush(self) -> None:
+        self.flushed_at = time.monotonic()
+        if not self.lines:
+            return
+        lines = self.lines
+        self.lines = []
+        self.size = 0
+        lines.append("")
+        if self.write is None:
+            sys.stdout.write("\n".join(lines))
+            sys.stdout.flush()
+        else:
+            self.write("\n".join(lines))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+class CaptureOutput(list):
+    """Keeps every printed line in the list, for embedding and tests."""
+
+    def __call__(self, text: str) -> None:
+        self.append(text)
+
+    def flush(self) -> None:
+        pass
+
+    def text(self) -> str:
+        return "".join(line + "\n" for line in self)
@@ -0,0 +1,231 @@
+"""Scanning and parsing spread over a pool of worker processes.
+
+A source is cut after newlines that lie outside strings and comments, where
+no lexeme can straddle the cut, and the chunks are scanned independently.
+Each chunk starts at the line its first character is on, so the stitched
+tokens, lines and errors are exactly those of scanning it in one go.
+
+Tokens are cut after top-level statements and the spans parsed
+independently. A span that parses without errors gives the statements a
+sequential parse would; from any other span on, statements are parsed here
+one at a time until a span boundary is reached again, so errors, and the
+recovery from them, are exactly those of Parser.
+"""
+import marshal
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from lox import core
+from lox.cache import AstEncoder, decode
+from lox.parser import Parser, StreamParser
+from lox.scanner import RegexScanner, BytesScanner, COMMENT_DELIMITER, BYTES_COMMENT_DELIMITER, _count_lines
+from lox.statements import Stmt
+from lox.tokens import Token, TokenType, TokenBuffer
+
+# Whatever may hide a newline from the scanner; a lone quote opens a string
+# that never ends
+SPLIT_PATTERN = re.compile(r'"[^"]*"|"|//[^\n]*|/\*')
+BYTES_SPLIT_PATTERN = re.compile(rb'"[^"]*"|"|//[^\r\n]*|/\*')
+
+def split_points(source, parts: int) -> List[int]:
+    """Offsets, each just after a newline outside strings and comments, that
+    cut source into at most parts chunks of roughly equal size."""
+    if isinstance(source, str):
+        pattern, delimiters, newline, quote, opener = SPLIT_PATTERN, COMMENT_DELIMITER, "\n", '"', "/*"
+    else:
+        pattern, delimiters, newline, quote, opener = BYTES_SPLIT_PATTERN, BYTES_COMMENT_DELIMITER, b"\n", b'"', b"/*"
+    end = len(source)
+    points = []
+    pos = 0
+    for part in range(1, parts):
+        target = max(pos, end * part // parts)
+        while True:
+            cut = source.find(newline, target)
+            if cut < 0:
+                return points
+            match = pattern.search(source, pos)
+            if match is None or match.start() > cut:
+                break
+            text = match.group()
+            if text == quote:
+                # The rest of the source is an unterminated string
+                return points
+            pos = match.end()
+            if text == opener:
+                depth = 1
+                while depth:
+                    match = delimiters.search(source, pos)
+                    if match is None:
+                        return points
+                    depth += 1 if match.group() == opener else -1
+                    pos = match.end()
+            target = max(pos, target)
+        pos = cut + 1
+        if pos >= end:
+            break
+        points.append(pos)
+    return points
+
+def _scan_chunk(chunk, offset: int, line: int):
+    """Scans one chunk in a worker; returns its token columns, minus the EOF
+    token, with starts made relative to the whole source, and its errors."""
+    scanner = (RegexScanner if isinstance(chunk, str) else BytesScanner)(chunk)
+    scanner.line = line
+    errors = []
+    with core.collect_errors(errors):
+        buffer = scanner.scan_buffer()
+    starts = array("I", [start + offset for start in buffer.starts[:-1]])
+    return buffer.types[:-1], starts, buffer.lengths[:-1], buffer.lines[:-1], buffer.lines[-1], errors
+
+class ParallelScanner:
+    """Scans a str or bytes-like source with up to jobs worker processes.
+
+    Sources shorter than min_chunk per job are scanned in this process.
+    scan_buffer() and scan_tokens() return what RegexScanner, for str, or
+    BytesScanner, for bytes, would.
+    """
+
+    def __init__(self, source, jobs: int = None, min_chunk: int = 1 << 18):
+        self.source = source
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_chunk = min_chunk
+
+    def scan_tokens(self) -> List[Token]:
+        return list(self.scan_buffer())
+
+    def scan_buffer(self) -> TokenBuffer:
+        source = self.source
+        parts = min(self.jobs, len(source) // self.min_chunk)
+        points = split_points(source, parts) if parts > 1 else []
+        if not points:
+            return (RegexScanner if isinstance(source, str) else BytesScanner)(source).scan_buffer()
+        bounds = list(zip([0] + points, points + [len(source)]))
+        lines = [1]
+        for start, end in bounds[:-1]:
+            lines.append(lines[-1] + self.count_lines(start, end))
+        with ProcessPoolExecutor(min(self.jobs, len(bounds))) as pool:
+            results = list(pool.map(
+                _scan_chunk,
+                [source[start:end] for start, end in bounds],
+                [start for start, _ in bounds],
+                lines,
+            ))
+        buffer = TokenBuffer(source)
+        for types, starts, lengths, token_lines, line, errors in results:
+            buffer.types += types
+            buffer.starts += starts
+            buffer.lengths += lengths
+            buffer.lines += token_lines
+            for error in errors:
+                core.report(error.line, error.where, error.message)
+        buffer.add(TokenType.EOF, "", None, line, len(source))
+        return buffer
+
+    def count_lines(self, start: int, end: int) -> int:
+        if isinstance(self.source, str):
+            return self.source.count("\n", start, end)
+        return _count_lines(self.source, start, end)
+
+def statement_boundaries(types: bytearray, parts: int) -> List[int]:
+    """Token indices, each just past a ';' or '}' outside braces and
+    parentheses, that cut the tokens before EOF into at most parts spans of
+    roughly equal length."""
+    openers = (TokenType.LEFT_PAREN.value, TokenType.LEFT_BRACE.value)
+    closers = (TokenType.RIGHT_PAREN.value, TokenType.RIGHT_BRACE.value)
+    semicolon = TokenType.SEMICOLON.value
+    end = len(types) - 1
+    points = []
+    pos = 0
+    depth = 0
+    for part in range(1, parts):
+        target = max(pos, end * part // parts)
+        while True:
+            cuts = [cut for cut in (types.find(semicolon, target, end), types.find(closers[1], target, end)) if cut >= 0]
+            if not cuts:
+                return points
+            cut = min(cuts) + 1
+            for opener in openers:
+                depth += types.count(opener, pos, cut)
+            for closer in closers:
+                depth -= types.count(closer, pos, cut)
+            pos = target = cut
+            # Stray closers are syntax errors; the parse falls back to Parser there anyway
+            if depth <= 0:
+                depth = 0
+                break
+        if pos >= end:
+            break
+        points.append(pos)
+    return points
+
+def _parse_span(source, offset: int, types: bytearray, starts: array, lengths: array, lines: array, eof_line: int) -> Optional[bytes]:
+    """Parses one span of tokens in a worker; returns its statements
+    marshalled as AstEncoder encodes them, or None if any error was found."""
+    buffer = TokenBuffer(source)
+    buffer.types = types
+    buffer.starts = array("I", [start - offset for start in starts])
+    buffer.lengths = lengths
+    buffer.lines = lines
+    buffer.add(TokenType.EOF, "", None, eof_line, len(source))
+    errors = []
+    with core.collect_errors(errors):
+        stmts = StreamParser(buffer).parse()
+    if errors:
+        return None
+    encoder = AstEncoder()
+    try:
+        return marshal.dumps(tuple(encoder.encode(stmt) for stmt in stmts))
+    except (RecursionError, ValueError):
+        # Nested too deeply to send back; this process parses the span itself
+        return None
+
+class ParallelParser:
+    """Parses a TokenBuffer with up to jobs worker processes.
+
+    Buffers with fewer than min_span tokens per job are parsed in this
+    process. parse() returns what Parser.parse would, and reports the same
+    errors.
+    """
+
+    def __init__(self, tokens: TokenBuffer, jobs: int = None, min_span: int = 1 << 14):
+        self.tokens = tokens
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_span = min_span
+
+    def parse(self) -> List[Stmt]:
+        tokens = self.tokens
+        count = len(tokens) - 1
+        parts = min(self.jobs, count // self.min_span)
+        points = statement_boundaries(tokens.types, parts) if parts > 1 else []
+        if not points:
+            return StreamParser(tokens).parse()
+        bounds = list(zip([0] + points, points + [count]))
+        source = tokens.source
+        with ProcessPoolExecutor(min(self.jobs, len(bounds))) as pool:
+            results = list(pool.map(
+                _parse_span,
+                [source[tokens.starts[start]:tokens.starts[end - 1] + tokens.lengths[end - 1]] for start, end in bounds],
+                [tokens.starts[start] for start, _ in bounds],
+                [tokens.types[start:end] for start, end in bounds],
+                [tokens.starts[start:end] for start, end in bounds],
+                [tokens.lengths[start:end] for start, end in bounds],
+                [tokens.lines[start:end] for start, end in bounds],
+                [tokens.lines[end] for _, end in bounds],
+            ))
+        spans = {start: (end, data) for (start, end), data in zip(bounds, results) if data is not None}
+        stmts = []
+        parser = Parser(tokens)
+        position = 0
+        while position < count:
+            span = spans.get(position)
+            if span is not None:
+                position, data = span
+                stmts.extend(decode(stmt) for stmt in marshal.loads(data))
+            else:
+                parser.current = position
+                stmts.append(parser.declaration())
+                position = parser.current
+        return stmts
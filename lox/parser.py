@@ -1,10 +1,31 @@
-from typing import List
+from typing import Iterable, List
 
 from lox import core
 from lox.tokens import Token, TokenType
 from lox.lox_types import Binary, Unary, Literal, Grouping, Variable, Assignment
 from lox.statements import Stmt, Print, Expression, Var, Block
 
+# Entries on the operator stack of Parser.expression
+BINARY, UNARY, PAREN, ASSIGN, INVALID_ASSIGN = range(5)
+
+BINARY_PRECEDENCE = {
+    TokenType.BANG_EQUAL: 1,
+    TokenType.EQUAL_EQUAL: 1,
+    TokenType.GREATER: 2,
+    TokenType.GREATER_EQUAL: 2,
+    TokenType.LESS: 2,
+    TokenType.LESS_EQUAL: 2,
+    TokenType.PLUS: 3,
+    TokenType.MINUS: 3,
+    TokenType.STAR: 4,
+    TokenType.SLASH: 4,
+}
+
+# Blocks nest no deeper than this. The passes after parsing, and every
+# engine, still recurse once per block, and all of them can run this many
+# levels on Python's default recursion limit.
+MAX_BLOCK_DEPTH = 200
+
 class ParserError(Exception):
     pass
 
@@ -12,6 +33,8 @@ class Parser:
     def __init__(self, tokens: List[Token]):
         self.tokens = tokens
         self.current = 0
+        # Blocks open around the statement being parsed
+        self.depth = 0
 
     def parse(self) -> List[Stmt]:
         stmts = []
@@ -40,15 +63,35 @@ class Parser:
         if self.match(TokenType.PRINT):
             return self.print_statement()
         elif self.match(TokenType.LEFT_BRACE):
-            return self.block()
+            if self.depth == MAX_BLOCK_DEPTH:
+                # Reported once, and the block is dropped whole so that its
+                # closing braces don't end the blocks around it
+                self.error(self.previous(), "Nesting too deep.")
+                self.skip_block()
+                return Block([])
+            return Block(self.block())
         return self.expression_statement()
 
     def block(self):
         stmts = []
-        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
-            stmts.append(self.declaration())
+        self.depth += 1
+        try:
+            while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
+                stmts.append(self.declaration())
+        finally:
+            self.depth -= 1
         self.consume(TokenType.RIGHT_BRACE, "Expect '}'after block")
         return stmts
+
+    def skip_block(self) -> None:
+        """Skips past the '}' that closes the block whose '{' was just matched."""
+        open_blocks = 1
+        while open_blocks and not self.is_at_end():
+            token_type = self.advance().type
+            if token_type == TokenType.LEFT_BRACE:
+                open_blocks += 1
+            elif token_type == TokenType.RIGHT_BRACE:
+                open_blocks -= 1
         
 
     def print_statement(self):
@@ -62,59 +105,80 @@ class Parser:
         return Expression(expr)
 
     def expression(self):
-        return self.assignment()
+        """Parses an expression with explicit operand and operator stacks.
 
-    def assignment(self):
-        expr = self.equality()
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            value = self.assignment()
-
-            if type(expr) == Variable:
-                name = expr.name
-                return Assignment(name, value)
-            
-            self.error(equals, "Invalid assignment target.")
-        return expr
-
-    def equality(self):
-        expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def comparison(self):
-        expr = self.term()
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def term(self):
-        expr = self.factor()
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def factor(self):
-        expr = self.unary()
-        while self.match(TokenType.STAR, TokenType.SLASH):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def unary(self):
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.primary()
+        This is precedence climbing without recursion: prefix operators, open
+        parentheses and assignments wait on the operator stack, so nesting is
+        bounded by memory instead of the Python stack. Trees and errors are
+        the same as for the recursive descent grammar
+
+            assignment -> IDENTIFIER "=" assignment | equality
+            equality   -> comparison (("!=" | "==") comparison)*
+            ...
+            unary      -> ("!" | "-") unary | primary
+            primary    -> literal | IDENTIFIER | "(" expression ")"
+        """
+        operands = []
+        operators = []
+        while True:
+            # Prefix operators and open parentheses, then an operand
+            while True:
+                if self.match(TokenType.BANG, TokenType.MINUS):
+                    operators.append((UNARY, self.previous()))
+                elif self.match(TokenType.LEFT_PAREN):
+                    operators.append((PAREN, None))
+                else:
+                    break
+            operands.append(self.primary())
+
+            # Infix operators and closing parentheses
+            while True:
+                token = self.peek()
+                precedence = BINARY_PRECEDENCE.get(token.type)
+                if precedence is not None:
+                    while operators and (
+                        operators[-1][0] == UNARY
+                        or (operators[-1][0] == BINARY and operators[-1][1] >= precedence)
+                    ):
+                        self.reduce(operands, operators)
+                    self.advance()
+                    operators.append((BINARY, precedence, token))
+                    break
+                if token.type == TokenType.EQUAL:
+                    # The target is everything since the last '=' or '('
+                    while operators and operators[-1][0] in (BINARY, UNARY):
+                        self.reduce(operands, operators)
+                    self.advance()
+                    operators.append((ASSIGN if type(operands[-1]) == Variable else INVALID_ASSIGN, token))
+                    break
+                self.reduce_group(operands, operators)
+                if not operators:
+                    return operands.pop()
+                # Only an open parenthesis can be left
+                self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression")
+                operators.pop()
+                operands.append(Grouping(operands.pop()))
+
+    def reduce(self, operands: list, operators: list) -> None:
+        operator = operators.pop()
+        kind = operator[0]
+        if kind == BINARY:
+            right = operands.pop()
+            operands.append(Binary(operands.pop(), operator[2], right))
+        elif kind == UNARY:
+            operands.append(Unary(operator[1], operands.pop()))
+        elif kind == ASSIGN:
+            value = operands.pop()
+            operands.append(Assignment(operands.pop().name, value))
+        else:
+            # Reported once the value parsed, and the target is kept
+            self.error(operator[1], "Invalid assignment target.")
+            operands.pop()
+
+    def reduce_group(self, operands: list, operators: list) -> None:
+        """Reduces everything back to the innermost open parenthesis."""
+        while operators and operators[-1][0] != PAREN:
+            self.reduce(operands, operators)
 
     def primary(self):
         if self.match(TokenType.FALSE):
@@ -127,10 +191,6 @@ class Parser:
             return Literal(self.previous().literal)
         elif self.match(TokenType.IDENTIFIER):
             return Variable(self.previous())
-        elif self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression")
-            return Grouping(expr)
         raise self.error(self.peek(), "Expect expression")   
 
     def match(self, *token_types: TokenType) -> bool:
@@ -143,11 +203,10 @@ class Parser:
     def consume(self, token_type: TokenType, message: str):
         if self.check(token_type):
             return self.advance()
-        error = self.error(self.peek() + message)
-        raise error
+        raise self.error(self.peek(), message)
 
     def error(self, token: Token, message: str):
-        core.error(token, message)
+        core.error_token(token, message)
         return ParserError()
 
     def is_at_end(self):
@@ -172,23 +231,42 @@ class Parser:
     def synchronize(self):
         self.advance()
         while not self.is_at_end():
-            if self.previous().type == TokenType.EOF:
+            if self.previous().type == TokenType.SEMICOLON:
                 return
-            elif self.peek() == TokenType.CLASS:
-                pass
-            elif self.peek() == TokenType.FUN:
-                pass
-            elif self.peek() == TokenType.VAR:
-                pass
-            elif self.peek() == TokenType.FOR:
-                pass
-            elif self.peek() == TokenType.IF:
-                pass
-            elif self.peek() == TokenType.WHILE:
-                pass
-            elif self.peek() == TokenType.PRINT:
-                pass
-            elif self.peek() == TokenType.RETURN:
-                pass
-        self.advance()
+            elif self.peek().type in (
+                TokenType.CLASS,
+                TokenType.FUN,
+                TokenType.VAR,
+                TokenType.FOR,
+                TokenType.IF,
+                TokenType.WHILE,
+                TokenType.PRINT,
+                TokenType.RETURN,
+            ):
+                return
+            self.advance()
+
+class StreamParser(Parser):
+    """Parser that pulls tokens from an iterator instead of indexing a list.
+
+    The grammar only ever looks at the current and the previous token, so
+    those two are all that is kept.
+    """
+
+    def __init__(self, tokens: Iterable[Token]):
+        self.stream = iter(tokens)
+        self.previous_token = None
+        self.current_token = next(self.stream)
+        self.depth = 0
+
+    def peek(self):
+        return self.current_token
 
+    def previous(self):
+        return self.previous_token
+
+    def advance(self):
+        if not self.is_at_end():
+            self.previous_token = self.current_token
+            self.current_token = next(self.stream)
+        return self.previous()
@@ -1,17 +1,73 @@
 #!/usr/bin/env python3
 
+import argparse
 import sys
 
-from lox.core import run_file, run_prompt
+from lox.core import ENGINES, SCOPE_ENGINES, run_file, run_prompt
 
-def main():
-    if len(sys.argv) > 2:
-        print("Usage: plox [script]")
+class ArgumentParser(argparse.ArgumentParser):
+    def error(self, message):
+        print(f"Usage: {self.usage}")
+        print(f"{self.prog}: error: {message}")
         sys.exit(64)
-    elif len(sys.argv) == 2:
-        run_file(sys.argv[1])
+
+def main():
+    if sys.argv[1:2] == ["batch"]:
+        return batch(sys.argv[2:])
+    parser = ArgumentParser(
+        prog="plox",
+        add_help=False,
+        usage=f"plox [--engine {{{','.join(ENGINES)}}}] [--scope-stats] [--stream] [--no-optimize] [--dump-ast] [--no-cache] [--timings] [--profile] [--profile-stacks FILE] [--jobs N] [--parallel-parse] [script]",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default="tree")
+    parser.add_argument("--scope-stats", action="store_true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--no-optimize", dest="optimize", action="store_false")
+    parser.add_argument("--dump-ast", action="store_true")
+    parser.add_argument("--no-cache", dest="cache", action="store_false")
+    parser.add_argument("--timings", action="store_true")
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--profile-stacks")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--parallel-parse", action="store_true")
+    parser.add_argument("script", nargs="?")
+    args = parser.parse_args()
+    if (args.profile or args.profile_stacks) and args.engine != "tree":
+        # The profiler instruments the tree-walker only
+        parser.error("--profile needs --engine tree")
+    if args.scope_stats and args.engine not in SCOPE_ENGINES:
+        parser.error(f"--scope-stats needs --engine {' or '.join(SCOPE_ENGINES)}")
+    if args.script:
+        run_file(
+            args.script,
+            args.engine,
+            args.scope_stats,
+            args.stream,
+            args.optimize,
+            args.dump_ast,
+            args.cache,
+            args.profile,
+            args.profile_stacks,
+            args.jobs,
+            args.parallel_parse,
+        )
     else:
-        run_prompt()
+        run_prompt(args.engine, args.timings)
+
+def batch(argv):
+    from lox.batch import run_batch
+
+    parser = ArgumentParser(
+        prog="plox batch",
+        add_help=False,
+        usage=f"plox batch [--engine {{{','.join(ENGINES)}}}] [--jobs N] [--no-optimize] path...",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default="tree")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--no-optimize", dest="optimize", action="store_false")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+    sys.exit(run_batch(args.paths, args.engine, args.jobs, args.optimize))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,112 @@
+import time
+from typing import Dict, List, Optional
+
+from lox.lox_types import Binary, Grouping, Unary, Variable, Assignment
+from lox.statements import Print, Expression, Var, Block
+from lox.interpreter import Interpreter
+
+def node_line(node) -> Optional[int]:
+    """Line of the first token found in node, or None for a bare literal."""
+    node_type = type(node)
+    if node_type is Binary:
+        return node_line(node.left) or node.operator.line
+    if node_type is Unary:
+        return node.operator.line
+    if node_type in (Variable, Assignment, Var):
+        return node.name.line
+    if node_type in (Print, Expression):
+        return node_line(node.expr)
+    if node_type is Grouping:
+        return node_line(node.expression)
+    if node_type is Block:
+        for stmt in node.stmts:
+            line = node_line(stmt)
+            if line is not None:
+                return line
+    return None
+
+class Profile:
+    """Counts and times collected by a ProfilingInterpreter.
+
+    Self time excludes children; total time includes them, counted once for
+    the outermost evaluation when a node type nests inside itself.
+    """
+
+    def __init__(self):
+        # node type -> [count, self time, total time]
+        self.nodes: Dict[str, List] = {}
+        # line -> [count, self time]
+        self.lines: Dict[int, List] = {}
+        # "Print:1;Binary:1;..." -> self time
+        self.stacks: Dict[str, float] = {}
+
+    def report(self, file, limit: int = 20) -> None:
+        total = sum(self_time for _, self_time, _ in self.nodes.values())
+        count = sum(count for count, _, _ in self.nodes.values())
+        print(f"== profile: {count} evaluations, {total * 1e3:.3f} ms ==", file=file)
+        print(f"{'node':<12} {'count':>10} {'self ms':>10} {'total ms':>10} {'self %':>7}", file=file)
+        for name, (count, self_time, total_time) in sorted(self.nodes.items(), key=lambda item: -item[1][1]):
+            share = self_time / total * 100 if total else 0.0
+            print(f"{name:<12} {count:>10} {self_time * 1e3:>10.3f} {total_time * 1e3:>10.3f} {share:>6.1f}%", file=file)
+        print(f"{'line':<12} {'count':>10} {'self ms':>10}", file=file)
+        for line, (count, self_time) in sorted(self.lines.items(), key=lambda item: -item[1][1])[:limit]:
+            print(f"{line:<12} {count:>10} {self_time * 1e3:>10.3f}", file=file)
+
+    def write_stacks(self, path: str) -> None:
+        """Writes collapsed stacks, in microseconds, for flamegraph.pl and similar tools."""
+        with open(path, "w") as f:
+            for stack, self_time in sorted(self.stacks.items()):
+                f.write(f"{stack} {round(self_time * 1e6)}\n")
+
+class ProfilingInterpreter(Interpreter):
+    """Tree-walking interpreter that times every node it evaluates.
+
+    It overrides visit() around the dispatch table of Interpreter, so the
+    plain Interpreter pays nothing for profiling.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = Profile()
+        self.table = Interpreter.visit.table
+        # Per active node: [stack key, line, time spent in children]
+        self.frames: List[list] = [["", 0, 0.0]]
+        self.active: Dict[type, int] = {}
+        self.node_lines: Dict[int, Optional[int]] = {}
+
+    def visit(self, node):
+        node_type = type(node)
+        parent = self.frames[-1]
+        line = self.node_lines.get(id(node))
+        if line is None:
+            line = self.node_lines[id(node)] = node_line(node) or parent[1]
+        label = f"{node_type.__name__}:{line}"
+        frame = [f"{parent[0]};{label}" if parent[0] else label, line, 0.0]
+        self.frames.append(frame)
+        outermost = not self.active.get(node_type)
+        self.active[node_type] = self.active.get(node_type, 0) + 1
+        start = time.perf_counter()
+        try:
+            return self.table[node_type](self, node)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.frames.pop()
+            self.active[node_type] -= 1
+            parent[2] += elapsed
+            self.record(node_type.__name__, frame[0], line, elapsed, elapsed - frame[2], outermost)
+
+    def record(self, name: str, stack: str, line: int, elapsed: float, self_time: float, outermost: bool) -> None:
+        profile = self.profile
+        stats = profile.nodes.get(name)
+        if stats is None:
+            stats = profile.nodes[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += self_time
+        if outermost:
+            stats[2] += elapsed
+        stats = profile.lines.get(line)
+        if stats is None:
+            stats = profile.lines[line] = [0, 0.0]
+        stats[0] += 1
+        stats[1] += self_time
+        profile.stacks[stack] = profile.stacks.get(stack, 0.0) + self_time
@@ -0,0 +1,336 @@
+import math
+import operator
+from typing import Dict, List, Optional, Tuple
+
+from lox.lox_types import Expr, Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.tokens import TokenType, Token
+from lox.typedispatch import visitor
+from lox.statements import Print, Expression, Var, Stmt, Block
+from lox.errors import RuntimeError
+from lox.interpreter import Interpreter
+
+# An emitted expression: Python source for its value, its static type, if
+# known, and how deeply the source nests. Constants and temporaries, which
+# later code cannot change, have depth 0.
+Value = Tuple[str, Optional[type], int]
+
+# Emitted expressions nesting deeper are assigned to a temporary first, well
+# inside the nesting CPython's parser accepts
+MAX_NESTING = 40
+
+ARITHMETIC = {
+    TokenType.MINUS: ("-", "_sub"),
+    TokenType.STAR: ("*", "_mul"),
+    TokenType.SLASH: ("/", "_div"),
+}
+
+COMPARISON = {
+    TokenType.GREATER: (">", "_gt"),
+    TokenType.GREATER_EQUAL: (">=", "_ge"),
+    TokenType.LESS: ("<", "_lt"),
+    TokenType.LESS_EQUAL: ("<=", "_le"),
+}
+
+EQUALITY = {
+    TokenType.BANG_EQUAL: "!=",
+    TokenType.EQUAL_EQUAL: "==",
+}
+
+class Unsupported(Exception):
+    """Raised for nodes the Python backend cannot translate."""
+
+def _falsey(value) -> bool:
+    return value is None or value is False
+
+def _helpers(tokens: List[Token]) -> Dict[str, object]:
+    """The functions compiled code calls for checked operations. They take
+    the index in tokens of the token to report errors at."""
+
+    def numbers(operation):
+        def checked(left, right, token: int):
+            if type(left) is float and type(right) is float:
+                return operation(left, right)
+            raise RuntimeError(tokens[token], "Operands must be numbers.")
+        return checked
+
+    def divide(left, right, token: int):
+        if type(left) is not float or type(right) is not float:
+            raise RuntimeError(tokens[token], "Operands must be numbers.")
+        if right == 0:
+            raise RuntimeError(tokens[token], "Right operand must be non-zero")
+        return left / right
+
+    def plus(left, right, token: int):
+        if type(left) == type(right) == float or type(left) == type(right) == str:
+            return left + right
+        elif (type(right) == str and type(left) == float) or (type(left) == str and type(right) == float):
+            return str(left) + str(right)
+        raise RuntimeError(tokens[token], "Operands must be two numbers or two strings.")
+
+    def negate(right, token: int):
+        if type(right) is not float:
+            raise RuntimeError(tokens[token], "Operand must be a number")
+        return -right
+
+    def undefined(token: int):
+        raise RuntimeError(tokens[token], f"Undefined variable {tokens[token].lexeme!r}.")
+
+    def assign(globals: Dict, name: str, value, token: int):
+        if name not in globals:
+            undefined(token)
+        globals[name] = value
+        return value
+
+    return {
+        "_sub": numbers(operator.sub),
+        "_mul": numbers(operator.mul),
+        "_div": divide,
+        "_gt": numbers(operator.gt),
+        "_ge": numbers(operator.ge),
+        "_lt": numbers(operator.lt),
+        "_le": numbers(operator.le),
+        "_plus": plus,
+        "_negate": negate,
+        "_falsey": _falsey,
+        "_assign": assign,
+    }
+
+class Program:
+    """A Lox program compiled into a CPython code object.
+
+    reads holds, for each line of the function's body, the index of the
+    token of the first read of each global on it.
+    """
+
+    def __init__(self, source: str, tokens: List[Token], constants: List, reads: List[Dict[str, int]]):
+        self.source = source
+        self.tokens = tokens
+        self.constants = constants
+        self.reads = reads
+        namespace = _helpers(tokens)
+        exec(compile(source, "<lox>", "exec"), namespace)
+        self.main = namespace["__lox__"]
+
+    def run(self, globals: Dict, stringify, out=print) -> None:
+        try:
+            self.main(globals, self.constants, out, stringify)
+        except KeyError as error:
+            # Only reading an undefined global raises KeyError
+            raise self.undefined(error) from None
+
+    def undefined(self, error: KeyError) -> RuntimeError:
+        """The Lox error for reading an undefined global. Nothing in a line
+        can define a global, so the first read of the name failed."""
+        traceback = error.__traceback__
+        while traceback.tb_frame.f_code is not self.main.__code__:
+            traceback = traceback.tb_next
+        token = self.tokens[self.reads[traceback.tb_lineno - 2][error.args[0]]]
+        return RuntimeError(token, f"Undefined variable {token.lexeme!r}.")
+
+class PythonCompiler:
+    """Translates statements into the source of one Python function.
+
+    Each statement becomes one line where it can: expressions are emitted
+    as nested Python expressions, which CPython evaluates left to right as
+    Lox does. Operations on operands whose type is known statically are
+    inlined, and the rest call helpers that keep Lox's runtime checks.
+    Block locals become Python locals; globals live in the interpreter's
+    global environment, passed in as G.
+    """
+
+    def __init__(self):
+        self.lines = []
+        # Per line, as Program.reads
+        self.line_reads = []
+        # Globals read by expressions not yet written to a line: name and
+        # token index, in evaluation order
+        self.reads = []
+        self.tokens = []
+        self.constants = []
+        self.scopes = []
+        self.temps = 0
+        self.locals = 0
+
+    def compile(self, stmts: List[Stmt]) -> Program:
+        for stmt in stmts:
+            self.emit(stmt)
+        body = self.lines or ["    pass"]
+        source = "\n".join(["def __lox__(G, K, _print, _stringify):"] + body)
+        return Program(source + "\n", self.tokens, self.constants, self.line_reads)
+
+    def line(self, text: str, start: int = 0) -> None:
+        """Adds a line evaluating the expressions emitted since reads held start entries."""
+        self.lines.append("    " + text)
+        self.line_reads.append(self.take(start))
+
+    def take(self, start: int, end: int = None) -> Dict[str, int]:
+        reads = {}
+        for name, token in self.reads[start:end]:
+            reads.setdefault(name, token)
+        del self.reads[start:end]
+        return reads
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"_{self.temps}"
+
+    def token(self, token: Token) -> int:
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    def constant(self, value) -> str:
+        if type(value) == float and not math.isfinite(value):
+            self.constants.append(value)
+            return f"K[{len(self.constants) - 1}]"
+        return repr(value)
+
+    def nest(self, text: str, static: Optional[type], depth: int, start: int) -> Value:
+        if depth > MAX_NESTING:
+            name = self.temp()
+            self.line(f"{name} = {text}", start)
+            return name, static, 0
+        return text, static, depth
+
+    def resolve(self, name: str) -> Optional[str]:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    @visitor(Stmt)
+    def emit(self, stmt: Stmt):
+        raise Unsupported(stmt)
+
+    @visitor(Expr)
+    def emit(self, expr: Expr):
+        raise Unsupported(expr)
+
+    @visitor(Block)
+    def emit(self, block: Block) -> None:
+        self.scopes.append({})
+        for stmt in block.stmts:
+            self.emit(stmt)
+        self.scopes.pop()
+
+    @visitor(Print)
+    def emit(self, stmt: Print) -> None:
+        self.temps = 0
+        text, _, _ = self.emit(stmt.expr)
+        self.line(f"_print(_stringify({text}))")
+
+    @visitor(Expression)
+    def emit(self, stmt: Expression) -> None:
+        self.temps = 0
+        text, _, _ = self.emit(stmt.expr)
+        self.line(text)
+
+    @visitor(Var)
+    def emit(self, var: Var) -> None:
+        self.temps = 0
+        text = "None"
+        if var.initializer is not None:
+            text, _, _ = self.emit(var.initializer)
+        name = var.name.lexeme
+        if self.scopes:
+            self.locals += 1
+            local = f"{name}_{self.locals}"
+            self.scopes[-1][name] = local
+            self.line(f"{local} = {text}")
+        else:
+            self.line(f"G[{name!r}] = {text}")
+
+    @visitor(Variable)
+    def emit(self, expr: Variable) -> Value:
+        local = self.resolve(expr.name.lexeme)
+        if local is not None:
+            return local, None, 1
+        name = expr.name.lexeme
+        self.reads.append((name, self.token(expr.name)))
+        return f"G[{name!r}]", None, 1
+
+    @visitor(Assignment)
+    def emit(self, expr: Assignment) -> Value:
+        start = len(self.reads)
+        text, static, depth = self.emit(expr.value)
+        local = self.resolve(expr.name.lexeme)
+        if local is not None:
+            return self.nest(f"({local} := {text})", static, depth + 1, start)
+        name = expr.name.lexeme
+        return self.nest(f"_assign(G, {name!r}, {text}, {self.token(expr.name)})", static, depth + 1, start)
+
+    @visitor(Binary)
+    def emit(self, expr: Binary) -> Value:
+        start = len(self.reads)
+        left = self.emit(expr.left)
+        mark = len(self.lines)
+        middle = len(self.reads)
+        right = self.emit(expr.right)
+        if len(self.lines) > mark and left[2]:
+            # The right operand needed lines of its own, which must not run
+            # before the left operand is evaluated
+            name = self.temp()
+            self.lines.insert(mark, f"    {name} = {left[0]}")
+            self.line_reads.insert(mark, self.take(start, middle))
+            left = (name, left[1], 0)
+        (a, left_type, _), (b, right_type, _) = left, right
+        floats = left_type is float and right_type is float
+        depth = max(left[2], right[2]) + 1
+        operator = expr.operator
+        if operator.type in ARITHMETIC:
+            symbol, helper = ARITHMETIC[operator.type]
+            if floats and (operator.type != TokenType.SLASH or type(expr.right) == Literal and expr.right.value):
+                return self.nest(f"({a} {symbol} {b})", float, depth, start)
+            return self.nest(f"{helper}({a}, {b}, {self.token(operator)})", float, depth, start)
+        elif operator.type == TokenType.PLUS:
+            if floats or left_type is str and right_type is str:
+                return self.nest(f"({a} + {b})", left_type, depth, start)
+            static = str if str in (left_type, right_type) else None
+            return self.nest(f"_plus({a}, {b}, {self.token(operator)})", static, depth, start)
+        elif operator.type in COMPARISON:
+            symbol, helper = COMPARISON[operator.type]
+            if floats:
+                return self.nest(f"({a} {symbol} {b})", bool, depth, start)
+            return self.nest(f"{helper}({a}, {b}, {self.token(operator)})", bool, depth, start)
+        elif operator.type in EQUALITY:
+            return self.nest(f"({a} {EQUALITY[operator.type]} {b})", bool, depth, start)
+        raise Unsupported(expr)
+
+    @visitor(Unary)
+    def emit(self, expr: Unary) -> Value:
+        start = len(self.reads)
+        text, static, depth = self.emit(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+            if static is float:
+                return self.nest(f"(-{text})", float, depth + 1, start)
+            return self.nest(f"_negate({text}, {self.token(expr.operator)})", float, depth + 1, start)
+        elif expr.operator.type == TokenType.BANG:
+            if static is bool:
+                return self.nest(f"(not {text})", bool, depth + 1, start)
+            return self.nest(f"_falsey({text})", bool, depth + 1, start)
+        raise Unsupported(expr)
+
+    @visitor(Grouping)
+    def emit(self, expr: Grouping) -> Value:
+        return self.emit(expr.expression)
+
+    @visitor(Literal)
+    def emit(self, expr: Literal) -> Value:
+        return self.constant(expr.value), type(expr.value), 0
+
+class PythonInterpreter(Interpreter):
+    """Runs programs as CPython bytecode, falling back to tree-walking for
+    anything PythonCompiler cannot translate."""
+
+    def prepare(self, stmts: List[Stmt]):
+        try:
+            return PythonCompiler().compile(stmts)
+        except Unsupported:
+            return super().prepare(stmts)
+
+    def run(self, program):
+        if type(program) is not Program:
+            return super().run(program)
+        try:
+            program.run(self.environment.values, self.stringify, self.out)
+        except RuntimeError as error:
+            self.runtime_error(error)
@@ -0,0 +1,94 @@
+import time
+from typing import Dict, List
+
+from lox import core, hooks
+from lox.tokens import Token, TokenType
+from lox.scanner import RegexScanner
+from lox.parser import Parser
+
+NESTING = {
+    TokenType.LEFT_BRACE: 1,
+    TokenType.RIGHT_BRACE: -1,
+    TokenType.LEFT_PAREN: 1,
+    TokenType.RIGHT_PAREN: -1,
+}
+
+class Session:
+    """A REPL session that keeps one interpreter, and its globals, alive.
+
+    Input is scanned as it arrives and only the pending, not yet executed,
+    tokens are kept. Once they end a statement (a ';' or '}' with every
+    brace and parenthesis closed, outside any string or comment) they are
+    parsed and run. Scan, parse and execute times for each batch are kept
+    in timings.
+    """
+
+    def __init__(self, engine: str = "tree"):
+        self.engine = engine
+        self.interpreter = core.ENGINES[engine]()
+        self.source = ""
+        self.pos = 0
+        self.line = 1
+        # The scanner's state at pos: inside a comment or string, or 0
+        self.state = 0
+        self.tokens: List[Token] = []
+        self.depth = 0
+        self.timings: Dict[str, float] = {}
+        self.scan_time = 0.0
+
+    def pending(self) -> bool:
+        return bool(self.tokens) or self.pos < len(self.source) or bool(self.state)
+
+    def feed(self, text: str) -> bool:
+        """Adds a line of input; returns True once it completed a batch and ran it.
+
+        An empty line forces whatever is pending to be parsed, errors and all.
+        """
+        start = time.perf_counter()
+        self.source += text + "\n"
+        first = len(self.tokens)
+        append = self.tokens.append
+        def emit(type, lexeme, literal, line, start):
+            append(Token(type, lexeme, literal, line))
+        # Lines end in a newline, so only strings and comments can still grow
+        self.pos, self.line, self.state = RegexScanner.scan_window(
+            self.source, self.pos, self.line, False, emit, len(self.source), self.state
+        )
+        for token in self.tokens[first:]:
+            self.depth += NESTING.get(token.type, 0)
+        self.scan_time += time.perf_counter() - start
+
+        if text and not self.complete():
+            return False
+        return self.execute()
+
+    def complete(self) -> bool:
+        if self.pos < len(self.source) or self.state or self.depth > 0 or not self.tokens:
+            return False
+        return self.tokens[-1].type in (TokenType.SEMICOLON, TokenType.RIGHT_BRACE)
+
+    def execute(self) -> bool:
+        if self.pos < len(self.source) or self.state:
+            # Report the unterminated string or comment
+            self.pos, self.line, _ = RegexScanner.scan_window(
+                self.source, self.pos, self.line, True, lambda *_: None, state=self.state
+            )
+        tokens = self.tokens + [Token(TokenType.EOF, "", None, self.line)]
+        self.source = ""
+        self.pos = 0
+        self.state = 0
+        self.tokens = []
+        self.depth = 0
+
+        start = time.perf_counter()
+        with hooks.phase("parse"):
+            stmts = Parser(tokens).parse()
+        parsed = time.perf_counter()
+        core.run_statements(stmts, self.engine, interpreter=self.interpreter)
+        done = time.perf_counter()
+
+        self.timings = {"scan": self.scan_time, "parse": parsed - start, "execute": done - parsed}
+        self.scan_time = 0.0
+        ran = not core.had_error
+        core.had_error = False
+        return ran
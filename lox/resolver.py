@@ -0,0 +1,79 @@
+from typing import Dict, List
+
+from lox.lox_types import Expr, Binary, Grouping, Unary, Variable, Assignment
+from lox.typedispatch import visitor
+from lox.statements import Print, Expression, Var, Stmt, Block
+
+class Resolver:
+    """Static pass that assigns every block-local variable a slot.
+
+    Variable and Assignment nodes are annotated with the number of scopes
+    between their use and the declaring block (depth) and the declaration's
+    index in that block (slot). Names not declared in an enclosing block keep
+    depth None and are looked up in the globals at runtime. Each Block
+    records how many slots it needs.
+    """
+
+    def __init__(self):
+        self.scopes: List[Dict[str, int]] = []
+
+    def resolve(self, stmts: List[Stmt]) -> None:
+        for stmt in stmts:
+            self.visit(stmt)
+
+    def resolve_local(self, expr) -> None:
+        for depth, scope in enumerate(reversed(self.scopes)):
+            if expr.name.lexeme in scope:
+                expr.depth = depth
+                expr.slot = scope[expr.name.lexeme]
+                return
+        expr.depth = expr.slot = None
+
+    @visitor(Block)
+    def visit(self, block: Block) -> None:
+        scope = {}
+        self.scopes.append(scope)
+        self.resolve(block.stmts)
+        self.scopes.pop()
+        block.slot_count = len(scope)
+
+    @visitor(Var)
+    def visit(self, var: Var) -> None:
+        # The initializer still sees any outer variable of the same name
+        if var.initializer is not None:
+            self.visit(var.initializer)
+        if not self.scopes:
+            var.slot = None
+            return
+        scope = self.scopes[-1]
+        # Redeclaring in the same block reuses the existing slot
+        var.slot = scope.setdefault(var.name.lexeme, len(scope))
+
+    @visitor(Print)
+    def visit(self, stmt: Print) -> None:
+        self.visit(stmt.expr)
+
+    @visitor(Expression)
+    def visit(self, stmt: Expression) -> None:
+        self.visit(stmt.expr)
+
+    @visitor(Expr)
+    def visit(self, expr: Expr) -> None:
+        # Expressions declare nothing, so the order nodes are resolved in
+        # doesn't matter and a work list avoids recursing on deep nesting
+        work = [expr]
+        while work:
+            expr = work.pop()
+            expr_type = type(expr)
+            if expr_type == Variable:
+                self.resolve_local(expr)
+            elif expr_type == Assignment:
+                self.resolve_local(expr)
+                work.append(expr.value)
+            elif expr_type == Binary:
+                work.append(expr.right)
+                work.append(expr.left)
+            elif expr_type == Unary:
+                work.append(expr.right)
+            elif expr_type == Grouping:
+                work.append(expr.expression)
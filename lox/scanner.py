@@ -1,7 +1,10 @@
-from typing import Any
+import codecs
+import re
+import sys
+from typing import Any, Iterator, List
 
 from lox import core
-from lox.tokens import Token, TokenType
+from lox.tokens import Token, TokenType, TokenBuffer
 
 KEYWORDS = {
     "and": TokenType.AND,
@@ -153,4 +156,304 @@ class Scanner:
         return char.upper() in set("ABCDEFGHIJKLMNOPQRSTUVWXYZ_")
 
     def is_alphanumeric(self, char: str) -> bool:
-        return self.is_digit(char) or self.is_alpha(char) or char == "_"
\ No newline at end of file
+        return self.is_digit(char) or self.is_alpha(char) or char == "_"
+
+SINGLE_TOKENS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# Characters Scanner.is_alpha accepts: it compares char.upper(), which also
+# maps the dotless i and the long s onto ASCII letters.
+_ALPHA = "A-Za-z_\u0131\u017f"
+
+# Group numbers double as the kind of lexeme matched.
+(_WHITESPACE, _NEWLINE, _IDENTIFIER, _NUMBER, _STRING, _LINE_COMMENT,
+ _BLOCK_COMMENT, _OPERATOR, _UNTERMINATED_STRING, _UNEXPECTED) = range(1, 11)
+
+TOKEN_PATTERN = re.compile(
+    r"([ \r\t]+)"
+    r"|(\n)"
+    rf"|([{_ALPHA}][{_ALPHA}0-9]*)"
+    r"|([0-9]+(?:\.[0-9]+)?)"
+    r'|("[^"]*")'
+    r"|(//[^\n]*)"
+    r"|(/\*)"
+    r"|([!=<>]=?|[(){},.\-+;*/])"
+    r'|(")'
+    r"|(.)"
+)
+
+COMMENT_DELIMITER = re.compile(r"/\*|\*/")
+
+# The state RegexScanner.scan_window stops in before an unterminated string;
+# positive states are the depth of an unterminated comment
+OPEN_STRING = -1
+
+class RegexScanner(Scanner):
+    """Scanner driven by one precompiled alternation instead of per-character calls.
+
+    Produces exactly the tokens, lines and errors of Scanner.
+    """
+
+    def scan_tokens(self) -> List[Token]:
+        append = self.tokens.append
+        def emit(type, text, literal, line, start):
+            append(Token(type, text, literal, line))
+
+        self.current, self.line, _ = self.scan_window(self.source, self.current, self.line, True, emit)
+        append(Token(TokenType.EOF, "", None, self.line))
+        return self.tokens
+
+    def scan_buffer(self) -> TokenBuffer:
+        """Scans into a compact TokenBuffer instead of a list of Tokens."""
+        buffer = TokenBuffer(self.source)
+        self.current, self.line, _ = self.scan_window(self.source, self.current, self.line, True, buffer.add)
+        buffer.add(TokenType.EOF, "", None, self.line, len(self.source))
+        return buffer
+
+    @staticmethod
+    def scan_window(source: str, pos: int, line: int, final: bool, emit, limit: int = None, state: int = 0):
+        """Scans source from pos, passing each token's type, lexeme, literal,
+        line and start offset to emit.
+
+        Unless final, more source may follow, so scanning stops before any
+        lexeme ending past limit (by default two characters, the scanner's
+        longest lookahead, before the end), before an unterminated string,
+        and inside an unterminated comment, once all but its last character
+        is skipped. Returns the position scanning stopped at, the current
+        line and the state there: the nesting depth of the open comment,
+        OPEN_STRING, or 0. Passing that state back resumes scanning in it.
+        """
+        end = len(source)
+        if limit is None:
+            limit = end if final else end - 2
+        if state > 0:
+            pos, line, state = RegexScanner.block_comment(source, pos, line, final, state)
+            if state:
+                return pos, line, state
+        keywords = KEYWORDS
+        single_tokens = SINGLE_TOKENS
+        identifier = TokenType.IDENTIFIER
+        number = TokenType.NUMBER
+        intern = sys.intern
+
+        while pos < end:
+            restart = None
+            for match in TOKEN_PATTERN.finditer(source, pos):
+                if match.end() > limit:
+                    return match.start(), line, 0
+                kind = match.lastindex
+                if kind == _WHITESPACE:
+                    continue
+                text = match.group()
+                if kind == _IDENTIFIER:
+                    emit(keywords.get(text, identifier), intern(text), None, line, match.start())
+                elif kind == _OPERATOR:
+                    emit(single_tokens[text], text, None, line, match.start())
+                elif kind == _NUMBER:
+                    emit(number, text, float(text), line, match.start())
+                elif kind == _NEWLINE:
+                    line += 1
+                elif kind == _STRING:
+                    line += text.count("\n")
+                    emit(TokenType.STRING, text, text[1:-1], line, match.start())
+                elif kind == _LINE_COMMENT:
+                    pass
+                elif kind == _BLOCK_COMMENT:
+                    restart, line, state = RegexScanner.block_comment(source, match.end(), line, final)
+                    if state:
+                        return restart, line, state
+                    break
+                elif kind == _UNTERMINATED_STRING:
+                    if not final:
+                        return match.start(), line, OPEN_STRING
+                    line += source.count("\n", match.end())
+                    core.error(line, "Unterminated string.")
+                    restart = end
+                    break
+                else:
+                    core.error(line, "Unexpected character")
+            if restart is None:
+                break
+            pos = restart
+        return end, line, 0
+
+    @staticmethod
+    def block_comment(source: str, pos: int, line: int, final: bool, depth: int = 1):
+        """Skips the rest of a comment nested depth deep at pos.
+
+        Returns where scanning resumes, the line, and the depth still open:
+        0 once the comment ends, or, if it does not end in source and more
+        may follow, its depth at the last character, which may begin a
+        delimiter and is not skipped.
+        """
+        while depth:
+            match = COMMENT_DELIMITER.search(source, pos)
+            if match is None:
+                if not final:
+                    stop = max(pos, len(source) - 1)
+                    return stop, line + source.count("\n", pos, stop), depth
+                line += source.count("\n", pos)
+                core.error(line, "Unterminated multi-line nested comment")
+                return len(source), line, 0
+            line += source.count("\n", pos, match.start())
+            depth += 1 if match.group() == "/*" else -1
+            pos = match.end()
+        return pos, line, 0
+
+# RegexScanner's grammar over UTF-8 bytes. Line breaks follow the universal
+# newlines of text-mode files: \r\n, \r and \n each end a line.
+BYTES_TOKEN_PATTERN = re.compile(
+    rb"([ \t]+)"
+    rb"|(\r\n|\r|\n)"
+    rb"|((?:[A-Za-z_]|\xc4\xb1|\xc5\xbf)(?:[A-Za-z0-9_]|\xc4\xb1|\xc5\xbf)*)"
+    rb"|([0-9]+(?:\.[0-9]+)?)"
+    rb'|("[^"]*")'
+    rb"|(//[^\r\n]*)"
+    rb"|(/\*)"
+    rb"|([!=<>]=?|[(){},.\-+;*/])"
+    rb'|(")'
+    rb"|([\xc0-\xdf][\x80-\xbf]|[\xe0-\xef][\x80-\xbf]{2}|[\xf0-\xf7][\x80-\xbf]{3}|[\x00-\xff])"
+)
+
+BYTES_COMMENT_DELIMITER = re.compile(rb"/\*|\*/")
+
+BYTES_KEYWORDS = {keyword.encode(): type for keyword, type in KEYWORDS.items()}
+BYTES_SINGLE_TOKENS = {lexeme.encode(): type for lexeme, type in SINGLE_TOKENS.items()}
+
+def _count_lines(source, start: int, end: int) -> int:
+    span = source[start:end]
+    return span.count(b"\n") + span.count(b"\r") - span.count(b"\r\n")
+
+class BytesScanner(RegexScanner):
+    """Scans a bytes-like source, such as an mmap, without decoding it.
+
+    Tokens go into a TokenBuffer of byte offsets, so a lexeme is only
+    decoded if the parser materializes its token.
+    """
+
+    def scan_tokens(self) -> List[Token]:
+        return list(self.scan_buffer())
+
+    def scan_buffer(self) -> TokenBuffer:
+        source = self.source
+        buffer = TokenBuffer(source)
+        add = buffer.add
+        line = self.line
+        end = len(source)
+        pos = self.current
+        keywords = BYTES_KEYWORDS
+        single_tokens = BYTES_SINGLE_TOKENS
+        identifier = TokenType.IDENTIFIER
+        number = TokenType.NUMBER
+
+        while pos < end:
+            restart = None
+            for match in BYTES_TOKEN_PATTERN.finditer(source, pos):
+                kind = match.lastindex
+                if kind == _WHITESPACE:
+                    continue
+                text = match.group()
+                if kind == _IDENTIFIER:
+                    add(keywords.get(text, identifier), text, None, line, match.start())
+                elif kind == _OPERATOR:
+                    add(single_tokens[text], text, None, line, match.start())
+                elif kind == _NUMBER:
+                    add(number, text, None, line, match.start())
+                elif kind == _NEWLINE:
+                    line += 1
+                elif kind == _STRING:
+                    line += _count_lines(text, 0, len(text))
+                    add(TokenType.STRING, text, None, line, match.start())
+                elif kind == _LINE_COMMENT:
+                    pass
+                elif kind == _BLOCK_COMMENT:
+                    restart, line = self.skip_comment(match.end(), line)
+                    break
+                elif kind == _UNTERMINATED_STRING:
+                    line += _count_lines(source, match.end(), end)
+                    core.error(line, "Unterminated string.")
+                    restart = end
+                    break
+                else:
+                    core.error(line, "Unexpected character")
+            if restart is None:
+                break
+            pos = restart
+
+        self.current = end
+        self.line = line
+        add(TokenType.EOF, b"", None, line, end)
+        return buffer
+
+    def skip_comment(self, pos: int, line: int):
+        source = self.source
+        count = 1
+        while count:
+            match = BYTES_COMMENT_DELIMITER.search(source, pos)
+            if match is None:
+                line += _count_lines(source, pos, len(source))
+                core.error(line, "Unterminated multi-line nested comment")
+                return len(source), line
+            line += _count_lines(source, pos, match.start())
+            count += 1 if match.group() == b"/*" else -1
+            pos = match.end()
+        return pos, line
+
+class StreamScanner:
+    """Yields tokens lazily from a file-like object.
+
+    Only the current chunk plus any lexeme left incomplete at its end is
+    held in memory; a comment spanning chunks is skipped as they arrive, and
+    a string spanning chunks is scanned once its closing quote is read.
+    read() may return str or, as for mmap objects, bytes, which are decoded
+    as UTF-8.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[Token]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        # Text not scanned yet; it only grows past one chunk inside a string
+        pending = []
+        line = 1
+        state = 0
+        final = False
+        while not final:
+            chunk = self.file.read(self.chunk_size)
+            final = not chunk
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk, final)
+            pending.append(chunk)
+            if state == OPEN_STRING and not final and '"' not in chunk:
+                continue
+            buffer = "".join(pending)
+            tokens = []
+            append = tokens.append
+            def emit(type, text, literal, line, start):
+                append(Token(type, text, literal, line))
+
+            pos, line, state = RegexScanner.scan_window(buffer, 0, line, final, emit, state=state)
+            pending = [buffer[pos:]]
+            yield from tokens
+        yield Token(TokenType.EOF, "", None, line)
@@ -0,0 +1,108 @@
+from typing import List, Tuple
+
+from lox.lox_types import Expr, Binary, Grouping, Literal, Unary, Variable, Assignment
+from lox.errors import RuntimeError
+from lox.statements import Stmt
+from lox.interpreter import Interpreter, PreparedTree, FLOAT_OPERATIONS
+
+# Instruction kinds of a flattened expression
+LITERAL, VARIABLE, ASSIGN, UNARY, BINARY = range(5)
+
+# (kind, node, operand): the operand is a literal's value or a Binary's float operation
+Instruction = Tuple[int, Expr, object]
+
+def flatten(expr: Expr) -> List[Instruction]:
+    """Lists the nodes of expr in evaluation (postfix) order, without recursing."""
+    code = []
+    work = [(expr, False)]
+    while work:
+        expr, children_done = work.pop()
+        expr_type = type(expr)
+        if expr_type == Grouping:
+            work.append((expr.expression, False))
+        elif expr_type == Literal:
+            code.append((LITERAL, expr, expr.value))
+        elif expr_type == Variable:
+            code.append((VARIABLE, expr, None))
+        elif children_done:
+            if expr_type == Unary:
+                code.append((UNARY, expr, None))
+            elif expr_type == Assignment:
+                code.append((ASSIGN, expr, None))
+            else:
+                code.append((BINARY, expr, FLOAT_OPERATIONS.get(expr.operator.type)))
+        elif expr_type == Binary:
+            work.append((expr, True))
+            work.append((expr.right, False))
+            work.append((expr.left, False))
+        elif expr_type == Unary:
+            work.append((expr, True))
+            work.append((expr.right, False))
+        elif expr_type == Assignment:
+            work.append((expr, True))
+            work.append((expr.value, False))
+    return code
+
+class PreparedStack(PreparedTree):
+    """A PreparedTree that also keeps the postfix code of each expression
+    evaluated so far."""
+
+    def __init__(self, stmts: List[Stmt]):
+        super().__init__(stmts)
+        self.postfix = {}
+
+class StackInterpreter(Interpreter):
+    """Tree-walker that evaluates expressions with an explicit value stack.
+
+    Each expression is flattened into postfix order once, kept with the
+    prepared statements, and then run in a loop, so expressions nest as
+    deeply as memory allows and deep ones skip a Python call per level.
+    Statements are visited as usual.
+    """
+
+    def __init__(self, out=print):
+        super().__init__(out)
+        # PreparedStack.postfix of the statements being run
+        self.postfix = {}
+
+    def prepare(self, stmts: List[Stmt]) -> PreparedStack:
+        return PreparedStack(stmts)
+
+    def run(self, prepared: PreparedStack):
+        self.postfix = prepared.postfix
+        super().run(prepared)
+
+    def evaluate(self, expr: Expr):
+        code = self.postfix.get(expr)
+        if code is None:
+            code = self.postfix[expr] = flatten(expr)
+        environment = self.environment
+        globals = self.globals
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for kind, node, operand in code:
+            if kind == BINARY:
+                right = pop()
+                left = stack[-1]
+                if operand is not None and type(left) is float and type(right) is float:
+                    try:
+                        stack[-1] = operand(left, right)
+                    except ZeroDivisionError:
+                        raise RuntimeError(node.operator, "Right operand must be non-zero")
+                else:
+                    stack[-1] = self.binary(node, left, right)
+            elif kind == LITERAL:
+                push(operand)
+            elif kind == VARIABLE:
+                if node.depth is None:
+                    push(globals.get(node.name))
+                else:
+                    push(environment.get_at(node.depth, node.slot))
+            elif kind == UNARY:
+                stack[-1] = self.unary(node, stack[-1])
+            elif node.depth is None:
+                globals.assign(node.name, stack[-1])
+            else:
+                environment.assign_at(node.depth, node.slot, stack[-1])
+        return stack[0]
@@ -1,19 +1,49 @@
+# Generated by lox/generate_ast.py; edit the node descriptions there, not this file.
+from typing import List, Optional, Tuple
+
+from lox.lox_types import Expr
+from lox.tokens import Token
+
+PRINT, EXPRESSION, VAR, BLOCK = range(6, 10)
+
 class Stmt:
-    pass
+    __slots__ = ()
+    # Integer tag of the node type, shared by its subclasses
+    kind: int
+    # Constructor arguments, in order
+    fields: Tuple[str, ...] = ()
 
 class Print(Stmt):
-    def __init__(self, expr):
+    __slots__ = ("expr",)
+    kind = PRINT
+    fields = ("expr",)
+
+    def __init__(self, expr: Expr):
         self.expr = expr
 
 class Expression(Stmt):
-    def __init__(self, expr):
+    __slots__ = ("expr",)
+    kind = EXPRESSION
+    fields = ("expr",)
+
+    def __init__(self, expr: Expr):
         self.expr = expr
 
 class Var(Stmt):
-    def __init__(self, name, initializer=None):
+    __slots__ = ("name", "initializer", "slot")
+    kind = VAR
+    fields = ("name", "initializer")
+
+    def __init__(self, name: Token, initializer: Optional[Expr] = None):
         self.name = name
         self.initializer = initializer
+        self.slot = None
 
 class Block(Stmt):
-    def __init__(self, stmts):
+    __slots__ = ("stmts", "slot_count")
+    kind = BLOCK
+    fields = ("stmts",)
+
+    def __init__(self, stmts: List[Stmt]):
         self.stmts = stmts
+        self.slot_count = 0
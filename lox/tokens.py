@@ -1,5 +1,7 @@
+import sys
+from array import array
 from enum import Enum
-from typing import Any
+from typing import Any, Iterator
 
 class TokenType(Enum):
 
@@ -52,6 +54,8 @@ class TokenType(Enum):
     EOF = 39
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
+
     def __init__(self, type: TokenType, lexeme: str, literal: Any, line: int):
         self.type = type
         self.lexeme = lexeme
@@ -60,3 +64,62 @@ class Token:
 
     def __str__(self) -> str:
         return "%s %s %s" % (self.type, self.lexeme, self.literal)
+
+# TokenType members indexed by value, for decoding TokenBuffer.types
+_TOKEN_TYPES = [None] * (max(t.value for t in TokenType) + 1)
+for _type in TokenType:
+    _TOKEN_TYPES[_type.value] = _type
+
+class TokenBuffer:
+    """Struct-of-arrays token store over the scanned source.
+
+    Each token costs a type byte and three unsigned ints (start offset,
+    length and line). Lexemes and literals are only sliced out of the
+    source when a token is materialized, which iterating does one at a
+    time; identifier lexemes are interned.
+    """
+
+    __slots__ = ("source", "encoded", "types", "starts", "lengths", "lines")
+
+    def __init__(self, source):
+        self.source = source
+        # Offsets into bytes-like sources are byte offsets, decoded as UTF-8
+        self.encoded = not isinstance(source, str)
+        self.types = bytearray()
+        self.starts = array("I")
+        self.lengths = array("I")
+        self.lines = array("I")
+
+    def add(self, type: TokenType, text, literal: Any, line: int, start: int) -> None:
+        self.types.append(type.value)
+        self.starts.append(start)
+        self.lengths.append(len(text))
+        self.lines.append(line)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def lexeme(self, index: int) -> str:
+        start = self.starts[index]
+        text = self.source[start:start + self.lengths[index]]
+        if self.encoded:
+            text = text.decode("utf-8")
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def __getitem__(self, index: int) -> Token:
+        type = _TOKEN_TYPES[self.types[index]]
+        lexeme = self.lexeme(index)
+        literal = None
+        if type == TokenType.NUMBER:
+            literal = float(lexeme)
+        elif type == TokenType.STRING:
+            literal = lexeme[1:-1]
+        elif type == TokenType.IDENTIFIER:
+            lexeme = sys.intern(lexeme)
+        return Token(type, lexeme, literal, self.lines[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self[index]
@@ -1,4 +1,9 @@
 # Taken from https://chris-lamb.co.uk/posts/visitor-pattern-in-python
+#
+# Handlers are collected while a class body executes. Once the class exists,
+# the placeholder left behind by the last @visitor method is swapped for a
+# dispatch function closed over a per-class table keyed on the argument type,
+# so visiting a node is a single dict lookup.
 def _qualname(obj):
     """Get the fully-qualified name of an object (including module)."""
     return obj.__module__ + '.' + obj.__qualname__
@@ -11,11 +16,42 @@ def _declaring_class(obj):
 # Stores the actual visitor methods
 _methods = {}
 
-# Delegating visitor implementation
-def _visitor_impl(self, arg):
-    """Actual visitor method implementation."""
-    method = _methods[(_qualname(type(self)), type(arg))]
-    return method(self, arg)
+# Methods registered for a class whose body is still executing
+_pending = {}
+
+class _VisitorTable(dict):
+    """Maps argument types to handlers, resolving subclasses through the MRO."""
+
+    def __missing__(self, arg_type):
+        for base in arg_type.__mro__[1:]:
+            method = self.get(base)
+            if method is not None:
+                self[arg_type] = method
+                return method
+        raise KeyError(arg_type)
+
+class _Dispatcher:
+    """Placeholder for a group of visitor methods until their class is created."""
+
+    def __set_name__(self, owner, name):
+        handlers = {}
+        for base in reversed(owner.__mro__[1:]):
+            handlers.update(base.__dict__.get("_visitors", {}).get(name, {}))
+        handlers.update(_pending.pop((_qualname(owner), name), {}))
+
+        visitors = dict(owner.__dict__.get("_visitors", {}))
+        visitors[name] = handlers
+        owner._visitors = visitors
+
+        table = _VisitorTable(handlers)
+
+        def dispatch(self, arg):
+            return table[type(arg)](self, arg)
+
+        dispatch.__name__ = name
+        dispatch.__qualname__ = owner.__qualname__ + '.' + name
+        dispatch.table = table
+        setattr(owner, name, dispatch)
 
 # The actual @visitor decorator
 def visitor(arg_type):
@@ -24,8 +60,9 @@ def visitor(arg_type):
     def decorator(fn):
         declaring_class = _declaring_class(fn)
         _methods[(declaring_class, arg_type)] = fn
+        _pending.setdefault((declaring_class, fn.__name__), {})[arg_type] = fn
 
-        # Replace all decorated methods with _visitor_impl
-        return _visitor_impl
+        # Replace all decorated methods with a placeholder resolved by __set_name__
+        return _Dispatcher()
 
     return decorator
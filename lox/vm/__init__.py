@@ -0,0 +1,3 @@
+from lox.vm.chunk import Chunk, OpCode
+from lox.vm.compiler import Compiler
+from lox.vm.vm import VM, VMInterpreter
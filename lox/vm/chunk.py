@@ -0,0 +1,86 @@
+from array import array
+from bisect import bisect_right
+from enum import IntEnum
+
+class OpCode(IntEnum):
+    # Instructions followed by a two byte operand
+    CONSTANT = 0
+    GET_GLOBAL = 1
+    DEFINE_GLOBAL = 2
+    SET_GLOBAL = 3
+    GET_LOCAL = 4
+    SET_LOCAL = 5
+
+    # Single byte instructions
+    NIL = 6
+    TRUE = 7
+    FALSE = 8
+    POP = 9
+    EQUAL = 10
+    NOT_EQUAL = 11
+    GREATER = 12
+    GREATER_EQUAL = 13
+    LESS = 14
+    LESS_EQUAL = 15
+    ADD = 16
+    SUBTRACT = 17
+    MULTIPLY = 18
+    DIVIDE = 19
+    NOT = 20
+    NEGATE = 21
+    PRINT = 22
+    RETURN = 23
+
+# Opcodes below this value carry a two byte operand
+OPERAND_OPS = OpCode.NIL
+
+class Chunk:
+    """A compiled sequence of bytecode with its constant pool.
+
+    Lines are run-length encoded: line_starts[i] is the offset of the first
+    byte emitted for lines[i].
+    """
+
+    def __init__(self):
+        self.code = array("B")
+        self.constants = []
+        self.line_starts = array("I")
+        self.lines = array("I")
+        self._constant_index = {}
+
+    def write(self, byte: int, line: int) -> None:
+        if not self.lines or self.lines[-1] != line:
+            self.line_starts.append(len(self.code))
+            self.lines.append(line)
+        self.code.append(byte)
+
+    def add_constant(self, value) -> int:
+        # bools compare equal to 0.0/1.0, so the type is part of the key
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self._constant_index[key] = index
+        return index
+
+    def line_at(self, offset: int) -> int:
+        index = bisect_right(self.line_starts, offset) - 1
+        return self.lines[index] if index >= 0 else 0
+
+    def disassemble(self, name: str = "chunk") -> str:
+        out = [f"== {name} =="]
+        offset = 0
+        while offset < len(self.code):
+            op = OpCode(self.code[offset])
+            if op < OPERAND_OPS:
+                operand = self.code[offset + 1] << 8 | self.code[offset + 2]
+                text = f"{op.name:<16} {operand:5}"
+                if op in (OpCode.CONSTANT, OpCode.GET_GLOBAL, OpCode.DEFINE_GLOBAL, OpCode.SET_GLOBAL):
+                    text += f" '{self.constants[operand]}'"
+                out.append(f"{offset:04} {self.line_at(offset):4} {text}")
+                offset += 3
+            else:
+                out.append(f"{offset:04} {self.line_at(offset):4} {op.name}")
+                offset += 1
+        return "\n".join(out)
@@ -0,0 +1,156 @@
+from typing import List
+
+from lox import core
+from lox.lox_types import Expr
+from lox.tokens import TokenType, Token
+from lox.typedispatch import visitor
+from lox.statements import Print, Expression, Var, Stmt, Block
+from lox.vm.chunk import Chunk, OpCode
+from lox.stack import flatten, LITERAL, VARIABLE, UNARY, BINARY
+
+MAX_OPERAND = 0xFFFF
+
+BINARY_OPS = {
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+}
+
+class CompileError(Exception):
+    pass
+
+class Local:
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+
+class Compiler:
+    """Compiles statements into a single Chunk.
+
+    Block locals live in value stack slots, as in clox; globals are looked up
+    by name at runtime.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk()
+        self.locals: List[Local] = []
+        self.scope_depth = 0
+        self.line = 1
+        self.had_error = False
+
+    def compile(self, stmts: List[Stmt]) -> Chunk:
+        for stmt in stmts:
+            try:
+                self.emit(stmt)
+            except CompileError:
+                pass
+        self.emit_op(OpCode.RETURN)
+        return self.chunk
+
+    def error(self, token: Token, message: str) -> CompileError:
+        if token is None:
+            core.error(self.line, message)
+        else:
+            core.error_token(token, message)
+        self.had_error = True
+        return CompileError()
+
+    def emit_op(self, op: OpCode) -> None:
+        self.chunk.write(op, self.line)
+
+    def emit_operand(self, op: OpCode, operand: int, token: Token) -> None:
+        if operand > MAX_OPERAND:
+            raise self.error(token, "Too many constants in one chunk.")
+        self.chunk.write(op, self.line)
+        self.chunk.write(operand >> 8, self.line)
+        self.chunk.write(operand & 0xFF, self.line)
+
+    def resolve_local(self, name: str) -> int:
+        for slot in range(len(self.locals) - 1, -1, -1):
+            if self.locals[slot].name == name:
+                return slot
+        return -1
+
+    @visitor(Block)
+    def emit(self, block: Block) -> None:
+        self.scope_depth += 1
+        for stmt in block.stmts:
+            self.emit(stmt)
+        self.scope_depth -= 1
+        while self.locals and self.locals[-1].depth > self.scope_depth:
+            self.emit_op(OpCode.POP)
+            self.locals.pop()
+
+    @visitor(Print)
+    def emit(self, stmt: Print) -> None:
+        self.emit(stmt.expr)
+        self.emit_op(OpCode.PRINT)
+
+    @visitor(Expression)
+    def emit(self, stmt: Expression) -> None:
+        self.emit(stmt.expr)
+        self.emit_op(OpCode.POP)
+
+    @visitor(Var)
+    def emit(self, var: Var) -> None:
+        if var.initializer is None:
+            self.emit_op(OpCode.NIL)
+        else:
+            self.emit(var.initializer)
+        self.line = var.name.line
+        name = var.name.lexeme
+
+        if self.scope_depth == 0:
+            self.emit_operand(OpCode.DEFINE_GLOBAL, self.chunk.add_constant(name), var.name)
+            return
+
+        # Redeclaring in the same block rebinds the existing slot
+        slot = self.resolve_local(name)
+        if slot != -1 and self.locals[slot].depth == self.scope_depth:
+            self.emit_operand(OpCode.SET_LOCAL, slot, var.name)
+            self.emit_op(OpCode.POP)
+            return
+        if len(self.locals) > MAX_OPERAND:
+            raise self.error(var.name, "Too many local variables.")
+        # The initializer's value is already in the new local's stack slot
+        self.locals.append(Local(name, self.scope_depth))
+
+    @visitor(Expr)
+    def emit(self, expr: Expr) -> None:
+        # Flattened first, so deeply nested expressions don't recurse
+        for kind, node, _ in flatten(expr):
+            if kind == LITERAL:
+                self.emit_literal(node.value)
+                continue
+            self.line = node.operator.line if kind in (BINARY, UNARY) else node.name.line
+            if kind == BINARY:
+                self.emit_op(BINARY_OPS[node.operator.type])
+            elif kind == UNARY:
+                self.emit_op(OpCode.NEGATE if node.operator.type == TokenType.MINUS else OpCode.NOT)
+            else:
+                slot = self.resolve_local(node.name.lexeme)
+                if slot != -1:
+                    self.emit_operand(OpCode.GET_LOCAL if kind == VARIABLE else OpCode.SET_LOCAL, slot, node.name)
+                else:
+                    op = OpCode.GET_GLOBAL if kind == VARIABLE else OpCode.SET_GLOBAL
+                    self.emit_operand(op, self.chunk.add_constant(node.name.lexeme), node.name)
+
+    def emit_literal(self, value) -> None:
+        if value is None:
+            self.emit_op(OpCode.NIL)
+        elif value is True:
+            self.emit_op(OpCode.TRUE)
+        elif value is False:
+            self.emit_op(OpCode.FALSE)
+        else:
+            index = self.chunk.add_constant(value)
+            if index > MAX_OPERAND:
+                raise self.error(None, "Too many constants in one chunk.")
+            self.emit_operand(OpCode.CONSTANT, index, None)
@@ -0,0 +1,176 @@
+from typing import Dict, List
+
+from lox.tokens import Token
+from lox.errors import RuntimeError
+from lox.statements import Stmt
+from lox.interpreter import Interpreter
+from lox.vm.chunk import Chunk, OpCode
+from lox.vm.compiler import Compiler
+
+CONSTANT = OpCode.CONSTANT.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+POP = OpCode.POP.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+PRINT = OpCode.PRINT.value
+RETURN = OpCode.RETURN.value
+
+COMPARISONS = {
+    GREATER: float.__gt__,
+    GREATER_EQUAL: float.__ge__,
+    LESS: float.__lt__,
+    LESS_EQUAL: float.__le__,
+}
+
+class VM:
+    """Executes a Chunk with an explicit value stack."""
+
+    def __init__(self, globals: Dict, stringify, out=print):
+        self.globals = globals
+        self.stringify = stringify
+        self.out = out
+        self.stack: List = []
+
+    def error(self, chunk: Chunk, offset: int, message: str) -> RuntimeError:
+        # Bytecode keeps lines rather than tokens; errors only report the line
+        return RuntimeError(Token(None, "", None, chunk.line_at(offset)), message)
+
+    def run(self, chunk: Chunk) -> None:
+        code = bytes(chunk.code)
+        constants = chunk.constants
+        globals = self.globals
+        stringify = self.stringify
+        out = self.out
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        while True:
+            op = code[ip]
+            if op == CONSTANT:
+                push(constants[code[ip + 1] << 8 | code[ip + 2]])
+                ip += 3
+            elif op == GET_LOCAL:
+                push(stack[code[ip + 1] << 8 | code[ip + 2]])
+                ip += 3
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is type(right) and (type(left) is float or type(left) is str):
+                    stack[-1] = left + right
+                elif (type(right) is str and type(left) is float) or (type(left) is str and type(right) is float):
+                    stack[-1] = str(left) + str(right)
+                else:
+                    raise self.error(chunk, ip, "Operands must be two numbers or two strings.")
+                ip += 1
+            elif op == SUBTRACT or op == MULTIPLY or op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                if op == SUBTRACT:
+                    stack[-1] = left - right
+                elif op == MULTIPLY:
+                    stack[-1] = left * right
+                elif right == 0:
+                    raise self.error(chunk, ip, "Right operand must be non-zero")
+                else:
+                    stack[-1] = left / right
+                ip += 1
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == GET_GLOBAL:
+                name = constants[code[ip + 1] << 8 | code[ip + 2]]
+                if name not in globals:
+                    raise self.error(chunk, ip, f"Undefined variable '{name}'.")
+                push(globals[name])
+                ip += 3
+            elif op == SET_LOCAL:
+                stack[code[ip + 1] << 8 | code[ip + 2]] = stack[-1]
+                ip += 3
+            elif op in COMPARISONS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = COMPARISONS[op](left, right)
+                ip += 1
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+                ip += 1
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] != right
+                ip += 1
+            elif op == NEGATE:
+                if type(stack[-1]) is not float:
+                    raise self.error(chunk, ip, "Operand must be a number")
+                stack[-1] = -stack[-1]
+                ip += 1
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+                ip += 1
+            elif op == NIL:
+                push(None)
+                ip += 1
+            elif op == TRUE:
+                push(True)
+                ip += 1
+            elif op == FALSE:
+                push(False)
+                ip += 1
+            elif op == PRINT:
+                out(stringify(pop()))
+                ip += 1
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip + 1] << 8 | code[ip + 2]]] = pop()
+                ip += 3
+            elif op == SET_GLOBAL:
+                name = constants[code[ip + 1] << 8 | code[ip + 2]]
+                if name not in globals:
+                    raise self.error(chunk, ip, f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+                ip += 3
+            elif op == RETURN:
+                return
+            else:
+                raise ValueError(f"Unknown opcode {op} at offset {ip}")
+
+class VMInterpreter(Interpreter):
+    """Compiles statements to bytecode and runs them on the stack VM."""
+
+    def prepare(self, stmts: List[Stmt]) -> Chunk:
+        compiler = Compiler()
+        chunk = compiler.compile(stmts)
+        if compiler.had_error:
+            return None
+        return chunk
+
+    def run(self, chunk: Chunk):
+        vm = VM(self.environment.values, self.stringify, self.out)
+        try:
+            vm.run(chunk)
+        except RuntimeError as error:
+            vm.stack.clear()
+            self.runtime_error(error)